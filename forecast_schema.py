@@ -0,0 +1,62 @@
+import polars as pl
+
+from spot_classifier import SPOT_NAMES
+from tide_index import NO_TIDE_DATA
+
+COMPASS_DIRECTIONS = [
+    "N",
+    "NNE",
+    "NE",
+    "ENE",
+    "E",
+    "ESE",
+    "SE",
+    "SSE",
+    "S",
+    "SSW",
+    "SW",
+    "WSW",
+    "W",
+    "WNW",
+    "NW",
+    "NNW",
+]
+PREDOMINANT_DIRECTIONS = ["N", "NE", "E", "SE", "S", "SW", "W", "NW"]
+DATE_NAMES = ["Ayer", "Hoy", "Mañana", "Pasado", "Otro día"]
+NEAREST_TIDES = ["Llena", "Vacía", NO_TIDE_DATA]
+
+COMPASS = pl.Enum(COMPASS_DIRECTIONS)
+PREDOMINANT = pl.Enum(PREDOMINANT_DIRECTIONS)
+DATE_NAME = pl.Enum(DATE_NAMES)
+
+# Every repeated label is stored as a code into a fixed vocabulary, and the
+# math.ceil'd measurements fit in small integers
+FORECAST_DTYPES = {
+    "wind_speed": pl.Int16,
+    "wind_direction_degrees": pl.UInt16,
+    "wave_height": pl.Int16,
+    "wave_direction_degrees": pl.UInt16,
+    "wave_period": pl.Int16,
+    "energy": pl.Int32,
+    "tide_percentage": pl.Int16,
+    "wind_direction": COMPASS,
+    "wave_direction": COMPASS,
+    "wind_direction_predominant": PREDOMINANT,
+    "wave_direction_predominant": PREDOMINANT,
+    "spot_name": pl.Enum(SPOT_NAMES),
+    "nearest_tide": pl.Enum(NEAREST_TIDES),
+    "date_name": DATE_NAME,
+    "date_friendly": pl.Categorical,
+    "time_friendly": pl.Categorical,
+    "tide": pl.Categorical,
+}
+
+
+def compact_forecast(df: pl.DataFrame) -> pl.DataFrame:
+    return df.with_columns(
+        [
+            pl.col(column).cast(dtype)
+            for column, dtype in FORECAST_DTYPES.items()
+            if column in df.columns
+        ]
+    )
@@ -0,0 +1,262 @@
+import glob
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Callable, Optional
+
+import polars as pl
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+CACHE_TTL_SECONDS = 3600
+MODEL_CACHE_PATH = "data/model_{id_model}_{id_spot}_{run}.json"
+# While upstream still serves the previous run, look again this often
+LATE_RUN_RETRY_SECONDS = 1800
+FRAME_CACHE_PATH = "data/forecast_{key}.arrow"
+# Bump when the built forecast frame changes shape, so old files are ignored
+FRAME_CACHE_VERSION = 5
+LOCK_WAIT_SECONDS = 60
+LOCK_POLL_SECONDS = 0.05
+
+_thread_locks = {}
+_thread_locks_guard = threading.Lock()
+
+
+class FileLock:
+    # flock on a sidecar .lock file, shared by every process and thread that
+    # opens it. Without fcntl (Windows) it only coordinates threads.
+    def __init__(self, filepath: str):
+        self.lock_path = f"{filepath}.lock"
+        self.fd = None
+        with _thread_locks_guard:
+            self.thread_lock = _thread_locks.setdefault(
+                self.lock_path, threading.Lock()
+            )
+
+    def acquire(self, timeout: Optional[float] = LOCK_WAIT_SECONDS) -> bool:
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            if self._try_acquire():
+                return True
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+            time.sleep(LOCK_POLL_SECONDS)
+
+    def _try_acquire(self) -> bool:
+        if fcntl is None:
+            return self.thread_lock.acquire(blocking=False)
+        os.makedirs(os.path.dirname(self.lock_path) or ".", exist_ok=True)
+        fd = os.open(self.lock_path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            os.close(fd)
+            return False
+        self.fd = fd
+        return True
+
+    def release(self):
+        if fcntl is None:
+            self.thread_lock.release()
+            return
+        fcntl.flock(self.fd, fcntl.LOCK_UN)
+        os.close(self.fd)
+        self.fd = None
+
+    def __enter__(self):
+        if not self.acquire():
+            raise TimeoutError(f"Timed out waiting for {self.lock_path}")
+        return self
+
+    def __exit__(self, *exc_info):
+        self.release()
+
+
+def read_json(filepath: str):
+    try:
+        with open(filepath, "r") as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+
+@contextmanager
+def atomic_path(filepath: str):
+    # Readers see either the previous file or the new one, never a partial write
+    directory = os.path.dirname(filepath) or "."
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(
+        dir=directory, prefix=f".{os.path.basename(filepath)}.", suffix=".tmp"
+    )
+    os.close(fd)
+    try:
+        os.chmod(tmp_path, 0o644)
+        yield tmp_path
+        os.replace(tmp_path, filepath)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def write_json_atomic(filepath: str, data):
+    with atomic_path(filepath) as tmp_path, open(tmp_path, "w") as f:
+        json.dump(data, f)
+        f.flush()
+        os.fsync(f.fileno())
+
+
+def load_cache(filepath, ttl_seconds=CACHE_TTL_SECONDS, now: Optional[float] = None):
+    data = read_json(filepath)
+    if data is None:
+        return None
+    now = now or time.time()
+    if ttl_seconds is not None and now - data["timestamp"] > ttl_seconds:
+        return None
+    return data["payload"]
+
+
+def save_cache(filepath, payload, **metadata):
+    write_json_atomic(
+        filepath, {"timestamp": time.time(), "payload": payload, **metadata}
+    )
+
+
+def single_flight(
+    filepath: str,
+    load_fresh: Callable,
+    refresh: Callable,
+    load_stale: Optional[Callable] = None,
+):
+    # Only one process refreshes a cache file at a time. The others serve the
+    # stale payload if there is one, or wait and read what the winner wrote.
+    cached = load_fresh()
+    if cached is not None:
+        return cached
+
+    lock = FileLock(filepath)
+    if lock.acquire(timeout=0):
+        try:
+            cached = load_fresh()
+            return cached if cached is not None else refresh()
+        finally:
+            lock.release()
+
+    stale = load_stale() if load_stale else None
+    if stale is not None:
+        return stale
+
+    with lock:
+        cached = load_fresh()
+        return cached if cached is not None else refresh()
+
+
+def model_cache_path(id_model: str, id_spot: str, model_run_time: datetime) -> str:
+    run = model_run_time.strftime("%Y%m%d%H")
+    return MODEL_CACHE_PATH.format(id_model=id_model, id_spot=id_spot, run=run)
+
+
+def model_lock_path(id_model: str, id_spot: str) -> str:
+    return MODEL_CACHE_PATH.format(id_model=id_model, id_spot=id_spot, run="refresh")
+
+
+def is_run_published(payload: dict, model_run_time: datetime) -> bool:
+    initstamp = (payload.get("fcst") or {}).get("initstamp")
+    return initstamp is not None and int(initstamp) >= model_run_time.timestamp()
+
+
+def load_model_cache(
+    id_model: str,
+    id_spot: str,
+    model_run_time: datetime,
+    now: Optional[float] = None,
+):
+    # The key changes with every model run, so a complete entry never expires
+    # on its own: the next run simply misses the cache
+    filepath = model_cache_path(id_model, id_spot, model_run_time)
+    data = read_json(filepath)
+    if data is None:
+        return None
+    if data.get("published"):
+        return data["payload"]
+    now = now or time.time()
+    if now - data["timestamp"] > LATE_RUN_RETRY_SECONDS:
+        return None
+    return data["payload"]
+
+
+def save_model_cache(
+    id_model: str, id_spot: str, model_run_time: datetime, payload: dict
+):
+    filepath = model_cache_path(id_model, id_spot, model_run_time)
+    save_cache(
+        filepath,
+        payload,
+        published=is_run_published(payload, model_run_time),
+    )
+    for old_filepath in list_model_caches(id_model, id_spot):
+        if old_filepath != filepath:
+            try:
+                os.remove(old_filepath)
+            except FileNotFoundError:
+                pass
+
+
+def list_model_caches(id_model: str, id_spot: str) -> list:
+    pattern = MODEL_CACHE_PATH.format(id_model=id_model, id_spot=id_spot, run="*")
+    return sorted(glob.glob(pattern))
+
+
+def load_latest_model_cache(id_model: str, id_spot: str):
+    filepaths = list_model_caches(id_model, id_spot)
+    if not filepaths:
+        return None
+    return load_cache(filepaths[-1], ttl_seconds=None)
+
+
+def payload_hash(payload) -> str:
+    encoded = json.dumps(payload, sort_keys=True, separators=(",", ":")).encode()
+    return hashlib.sha256(encoded).hexdigest()
+
+
+def frame_cache_key(spot_payloads: dict, tides: list):
+    # The cached frame only depends on the raw payloads. Day dependent columns
+    # like date_name are added by final_forecast_format after loading it.
+    digest = hashlib.sha256()
+    digest.update(f"v{FRAME_CACHE_VERSION}".encode())
+    for id_spot, (waves_data, wind_data) in sorted(spot_payloads.items()):
+        digest.update(f"|{id_spot}|".encode())
+        digest.update(payload_hash(waves_data).encode())
+        digest.update(payload_hash(wind_data).encode())
+    digest.update(payload_hash(tides).encode())
+    return digest.hexdigest()[:32]
+
+
+def load_frame_cache(key: str) -> Optional[pl.DataFrame]:
+    filepath = FRAME_CACHE_PATH.format(key=key)
+    if not os.path.exists(filepath):
+        return None
+    try:
+        # Uncompressed IPC files are memory-mapped by polars instead of copied
+        return pl.read_ipc(filepath)
+    except (OSError, pl.exceptions.PolarsError):
+        return None
+
+
+def save_frame_cache(key: str, df: pl.DataFrame):
+    filepath = FRAME_CACHE_PATH.format(key=key)
+    with atomic_path(filepath) as tmp_path:
+        df.write_ipc(tmp_path, compression="uncompressed")
+    for old_filepath in glob.glob(FRAME_CACHE_PATH.format(key="*")):
+        if old_filepath != filepath:
+            try:
+                os.remove(old_filepath)
+            except OSError:
+                pass
@@ -0,0 +1,64 @@
+import numpy as np
+import polars as pl
+
+ENERGY_CHART_POINT_BUDGET = 600
+# Never squeeze a spot below this, however many spots share the budget
+MIN_POINTS_PER_SPOT = 48
+ENERGY_CHART_COLUMNS = [
+    "datetime",
+    "spot_name",
+    "spot_label",
+    "energy",
+    "wave_height",
+    "wave_period",
+]
+
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, threshold: int) -> np.ndarray:
+    # Largest-triangle-three-buckets: keeps the first and last points and, per
+    # bucket, the point spanning the largest triangle with its neighbours
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    x = x.astype(float)
+    y = y.astype(float)
+    edges = np.linspace(1, n - 1, threshold - 1).astype(np.int64)
+    selected = np.empty(threshold, dtype=np.int64)
+    selected[0] = 0
+    selected[-1] = n - 1
+    previous = 0
+    for bucket in range(threshold - 2):
+        start, end = edges[bucket], edges[bucket + 1]
+        next_start = end
+        next_end = edges[bucket + 2] if bucket + 2 < len(edges) else n
+        next_x = x[next_start:next_end].mean()
+        next_y = y[next_start:next_end].mean()
+
+        areas = np.abs(
+            (x[previous] - next_x) * (y[start:end] - y[previous])
+            - (x[previous] - x[start:end]) * (next_y - y[previous])
+        )
+        previous = start + int(np.argmax(areas))
+        selected[bucket + 1] = previous
+    return selected
+
+
+def downsample_energy(
+    data: pl.DataFrame, point_budget: int = ENERGY_CHART_POINT_BUDGET
+) -> pl.DataFrame:
+    columns = [column for column in ENERGY_CHART_COLUMNS if column in data.columns]
+    # One series per forecast point and spot when the frame is labelled
+    series = "spot_label" if "spot_label" in data.columns else "spot_name"
+    data = data.select(columns).sort(series, "datetime")
+    spots = data.partition_by(series, maintain_order=True)
+    if not spots:
+        return data
+    per_spot = max(point_budget // len(spots), MIN_POINTS_PER_SPOT)
+
+    downsampled = []
+    for spot_df in spots:
+        x = spot_df["datetime"].dt.epoch("us").to_numpy()
+        y = spot_df["energy"].fill_null(0).to_numpy()
+        downsampled.append(spot_df[lttb_indices(x, y, per_spot)])
+    return pl.concat(downsampled)
@@ -0,0 +1,86 @@
+import logging
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Callable, Dict, Tuple
+
+# Wall time each source may take, retries included, before its stale cache is
+# served instead; nothing waits longer than the total
+FETCH_BUDGET_SECONDS = {"waves": 25, "wind": 25, "tides": 35}
+FETCH_TOTAL_BUDGET_SECONDS = 40
+# How often the orchestrator re-checks budgets while nothing completes
+FETCH_POLL_SECONDS = 0.25
+
+logger = logging.getLogger(__name__)
+
+
+def fetch_sources(
+    sources: Dict[tuple, Tuple[Callable, Callable]],
+    max_workers: int,
+    budgets: Dict[str, float] = FETCH_BUDGET_SECONDS,
+    total_budget: float = FETCH_TOTAL_BUDGET_SECONDS,
+) -> Dict:
+    # sources maps (kind, id) to (fetch, fallback). Each source gets its own
+    # budget from the moment its fetch starts running; total_budget caps the
+    # whole call, including sources still queued behind a busy worker. A
+    # failed or late source returns its fallback, the others are unaffected.
+    # fetch is called with budget=, the seconds it has left, so its retries
+    # can stop before they are abandoned here.
+    started_at = {}
+
+    def run(key, fetch):
+        started_at[key] = time.monotonic()
+        return fetch(budget=deadline(key) - started_at[key])
+
+    load_started = time.monotonic()
+    hard_deadline = load_started + total_budget
+
+    def deadline(key) -> float:
+        if key not in started_at:
+            return hard_deadline
+        return min(started_at[key] + budgets[key[0]], hard_deadline)
+
+    executor = ThreadPoolExecutor(max_workers=max_workers)
+    futures = {
+        executor.submit(run, key, fetch): key for key, (fetch, _) in sources.items()
+    }
+    results = {}
+
+    def fall_back(key):
+        results[key] = sources[key][1]()
+
+    pending = set(futures)
+    while pending:
+        now = time.monotonic()
+        for future in [future for future in pending if not future.done()]:
+            if now >= deadline(futures[future]):
+                pending.discard(future)
+                future.cancel()
+                logger.warning(
+                    "Fetching %s for spot %s ran out of time, falling back to "
+                    "stale cache",
+                    *futures[future],
+                )
+                fall_back(futures[future])
+        if not pending:
+            break
+
+        next_deadline = min(deadline(futures[future]) for future in pending)
+        done, _ = wait(
+            pending,
+            timeout=max(min(next_deadline - now, FETCH_POLL_SECONDS), 0),
+            return_when=FIRST_COMPLETED,
+        )
+        for future in done:
+            pending.discard(future)
+            key = futures[future]
+            try:
+                results[key] = future.result()
+            except Exception:
+                logger.exception(
+                    "Fetching %s for spot %s failed, falling back to stale cache",
+                    *key,
+                )
+                fall_back(key)
+    # A timed out fetch keeps running in its thread, but nobody waits for it
+    executor.shutdown(wait=False, cancel_futures=True)
+    return {key: results[key] for key in sources}
@@ -0,0 +1,113 @@
+import threading
+from collections import OrderedDict
+from typing import Iterable, Tuple
+
+import numpy as np
+import polars as pl
+
+FILTER_CACHE_ENTRIES = 32
+CATEGORY_COLUMNS = ["date", "date_name", "spot_name"]
+RANGE_COLUMNS = ["wind_speed", "energy"]
+
+
+def normalize_filters(
+    dates: Iterable,
+    date_names: Iterable,
+    beaches: Iterable,
+    wind_range: Tuple[float, float],
+    energy_range: Tuple[float, float],
+) -> tuple:
+    # Selection order doesn't change the result, so it doesn't change the key
+    return (
+        tuple(sorted(set(dates))),
+        tuple(sorted(set(date_names))),
+        tuple(sorted(set(beaches))),
+        (float(wind_range[0]), float(wind_range[1])),
+        (float(energy_range[0]), float(energy_range[1])),
+    )
+
+
+class ForecastFilter:
+    # Built once per forecast frame. Category columns are encoded to integer
+    # codes and range columns get a sorted index, so each new filter state is a
+    # handful of numpy operations; repeated states come from a small LRU.
+    def __init__(
+        self, forecast: pl.DataFrame, cache_entries: int = FILTER_CACHE_ENTRIES
+    ):
+        self.forecast = forecast
+        self.cache_entries = cache_entries
+        self.categories = {}
+        self.codes = {}
+        for column in CATEGORY_COLUMNS:
+            values = forecast[column].unique(maintain_order=True)
+            self.categories[column] = values.to_list()
+            lookup = pl.DataFrame(
+                {column: values, "code": np.arange(len(values), dtype=np.int32)}
+            )
+            self.codes[column] = (
+                forecast.select(column)
+                .join(lookup, on=column, how="left", maintain_order="left")["code"]
+                .fill_null(-1)
+                .to_numpy()
+            )
+
+        self.sorted_values = {}
+        self.sorted_rows = {}
+        self.bounds = {}
+        for column in RANGE_COLUMNS:
+            values = forecast[column].cast(pl.Float64)
+            rows = np.flatnonzero(values.is_not_null().to_numpy())
+            values = values.to_numpy()[rows]
+            order = np.argsort(values, kind="stable")
+            self.sorted_values[column] = values[order]
+            self.sorted_rows[column] = rows[order]
+            self.bounds[column] = (forecast[column].min(), forecast[column].max())
+
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+
+    def category_mask(self, column: str, selection: tuple) -> np.ndarray:
+        categories = self.categories[column]
+        selected = set(selection)
+        selected_codes = [
+            code for code, value in enumerate(categories) if value in selected
+        ]
+        return np.isin(self.codes[column], selected_codes)
+
+    def range_mask(self, column: str, low: float, high: float) -> np.ndarray:
+        values = self.sorted_values[column]
+        start = np.searchsorted(values, low, side="left")
+        end = np.searchsorted(values, high, side="right")
+        mask = np.zeros(self.forecast.height, dtype=bool)
+        mask[self.sorted_rows[column][start:end]] = True
+        return mask
+
+    def filter(
+        self,
+        dates: Iterable,
+        date_names: Iterable,
+        beaches: Iterable,
+        wind_range: Tuple[float, float],
+        energy_range: Tuple[float, float],
+    ) -> pl.DataFrame:
+        key = normalize_filters(dates, date_names, beaches, wind_range, energy_range)
+        with self._lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                return self._cache[key]
+
+        dates, date_names, beaches, wind_range, energy_range = key
+        mask = (
+            self.category_mask("date", dates)
+            & self.category_mask("date_name", date_names)
+            & self.category_mask("spot_name", beaches)
+            & self.range_mask("wind_speed", *wind_range)
+            & self.range_mask("energy", *energy_range)
+        )
+        filtered = self.forecast.filter(pl.Series(mask))
+
+        with self._lock:
+            self._cache[key] = filtered
+            while len(self._cache) > self.cache_entries:
+                self._cache.popitem(last=False)
+        return filtered
@@ -0,0 +1,76 @@
+import logging
+import threading
+import time
+from typing import Callable, Optional
+
+import polars as pl
+
+REFRESH_INTERVAL_SECONDS = 300
+# Refresh cache entries that would expire before the next tick
+REFRESH_AHEAD_SECONDS = 2 * REFRESH_INTERVAL_SECONDS
+
+logger = logging.getLogger(__name__)
+
+
+class ForecastRefresher:
+    def __init__(
+        self,
+        load_forecast: Callable[..., pl.DataFrame],
+        interval_seconds: float = REFRESH_INTERVAL_SECONDS,
+        ahead_seconds: float = REFRESH_AHEAD_SECONDS,
+    ):
+        self.load_forecast = load_forecast
+        self.interval_seconds = interval_seconds
+        self.ahead_seconds = ahead_seconds
+        self.forecast: Optional[pl.DataFrame] = None
+        self.refreshed_at: Optional[float] = None
+        self._refresh_lock = threading.RLock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(
+                target=self._run, name="forecast-refresher", daemon=True
+            )
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self.interval_seconds):
+            self.refresh(ahead_seconds=self.ahead_seconds)
+
+    def refresh(self, ahead_seconds: float = 0) -> bool:
+        with self._refresh_lock:
+            try:
+                forecast = self.load_forecast(ahead_seconds=ahead_seconds)
+            except Exception:
+                logger.exception("Background forecast refresh failed")
+                return False
+            if forecast.is_empty():
+                return False
+            # Readers keep the previous frame until this single assignment
+            self.forecast = forecast
+            self.refreshed_at = time.time()
+            return True
+
+    def refresh_if_missing(self) -> bool:
+        with self._refresh_lock:
+            # Sessions that queued behind the first load reuse its frame
+            if self.forecast is not None:
+                return True
+            return self.refresh()
+
+    def get_forecast(self) -> pl.DataFrame:
+        forecast = self.forecast
+        if forecast is None:
+            # Only the very first render waits for upstream
+            self.refresh_if_missing()
+            forecast = self.forecast
+        return forecast if forecast is not None else pl.DataFrame()
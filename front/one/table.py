@@ -1,26 +1,81 @@
+import hashlib
 import json
-import os
+import logging
 import time
-from datetime import datetime, timedelta, timezone
+from datetime import date, datetime, timedelta, timezone
+from functools import partial
+from typing import Dict, Optional
 
 import altair as alt
-import pandas as pd
 import polars as pl
 import streamlit as st
 from st_aggrid import AgGrid, ColumnsAutoSizeMode, GridOptionsBuilder
 
+from front.one.cache import (
+    frame_cache_key,
+    load_cache,
+    load_frame_cache,
+    load_latest_model_cache,
+    load_model_cache,
+    model_lock_path,
+    save_cache,
+    save_frame_cache,
+    save_model_cache,
+    single_flight,
+)
+from front.one.chart_data import downsample_energy
+from front.one.fetch import fetch_sources
+from front.one.filters import ForecastFilter
+from front.one.refresh import ForecastRefresher
+from front.one.tide_history import ingest_tides, load_tides
+from scrapers.client import get_http_client
+from scrapers.retry import fetch_stats, get_fetcher
 from scrapers.tides import TidesScraperLanzarote
-from scrapers.windguru import Windguru
+from scrapers.windguru import WAVES_MODEL_ID, WIND_MODEL_ID, Windguru
+from tide_index import tide_curve
+from tracing import TRACE_EXPORT_PATH, JsonlExporter, get_tracer, span, traced
+from urls.windguru import get_spot_ids
 from utils import construct_date_selection_list, final_forecast_format, is_mobile
 
 DEFAULT_MIN_WAVE_PERIOD = 0
 DEFAULT_WAVE_HEIGHT = 0.0
 DEFAULT_MIN_WAVE_ENERGY = 100
-RETRIES = 100
-CACHE_TTL_SECONDS = 3600
-WAVES_CACHE_PATH = "data/waves.json"
-WIND_CACHE_PATH = "data/wind.json"
 TIDES_CACHE_PATH = "data/tides.json"
+# History the harmonic fit sees, and how far back the aligned window starts
+TIDE_FIT_DAYS = 60
+TIDE_WINDOW_PAST_SECONDS = 2 * 86400
+FETCH_TIMEOUT_SECONDS = {"waves": 20, "wind": 20, "tides": 30}
+MAX_CONCURRENT_FETCHES = 4
+HTTP_POOL_SIZE = 2 * MAX_CONCURRENT_FETCHES
+HTTP2_ENABLED = True
+# Grid payloads kept across reruns, one per opened spot and day
+GRID_CACHE_ENTRIES = 256
+# Downsampled chart frames, one per filter state rather than per spot and day
+ENERGY_CHART_CACHE_ENTRIES = 32
+DAY_TABLE_COLUMNS = [
+    "spot_id",
+    "spot_label",
+    "spot_name",
+    "date",
+    "datetime",
+    "date_name",
+    "date_friendly",
+    "time_friendly",
+]
+GRID_ROWS = [
+    "energy",
+    "nearest_tide",
+    "tide",
+    "wind_direction",
+    "wind_direction_predominant",
+    "wave_height",
+    "wave_period",
+    "wave_direction",
+    "wave_direction_predominant",
+    "wind_speed",
+]
+
+logger = logging.getLogger(__name__)
 
 
 def get_list_of_spots_sorted_by_param(param, grouped_data):
@@ -45,24 +100,31 @@ def get_default_wind_approval_selection(wind_approval_list):
     return []
 
 
+@st.cache_data(max_entries=ENERGY_CHART_CACHE_ENTRIES, show_spinner=False)
+def energy_chart_data(filter_hash: str, _data: pl.DataFrame) -> pl.DataFrame:
+    # One entry per filter state; altair reads the polars frame directly
+    return downsample_energy(_data)
+
+
+@traced("render.chart")
 def plot_graph(add_data: str, data: pl.DataFrame):
     if not data.is_empty():
         st.header(f"Energía por días ({add_data})", divider="rainbow")
 
-        source = data.to_pandas()
+        source = energy_chart_data(frame_hash(data), data)
         now = datetime.now(timezone.utc)
         highlight = alt.selection_point(
-            on="mouseover", fields=["spot_name"], nearest=True
+            on="mouseover", fields=["spot_label"], nearest=True
         )
         base = alt.Chart(source).encode(
             x=alt.X("datetime:T", title="Día y Hora"),
             y=alt.Y("energy:Q", title="Energía (kJ)", scale=alt.Scale(zero=False)),
             color=alt.Color(
-                "spot_name:N", title="Playa", scale=alt.Scale(scheme="tableau10")
+                "spot_label:N", title="Playa", scale=alt.Scale(scheme="tableau10")
             ),
             tooltip=[
                 alt.Tooltip("datetime:T", format="%H:%M %d/%m", title="Hora"),
-                alt.Tooltip("spot_name:N", title="Playa"),
+                alt.Tooltip("spot_label:N", title="Playa"),
                 alt.Tooltip("energy:Q", title="Energía (kJ)"),
                 alt.Tooltip("wave_height:Q", title="Altura (m)"),
                 alt.Tooltip("wave_period:Q", title="Periodo (s)"),
@@ -77,7 +139,7 @@ def plot_graph(add_data: str, data: pl.DataFrame):
         points = base.mark_point(filled=True, size=60).encode(
             opacity=alt.condition(~highlight, alt.value(0.3), alt.value(1))
         )
-        now_df = pd.DataFrame({"now": [now]})
+        now_df = pl.DataFrame({"now": [now]})
         rule = (
             alt.Chart(now_df)
             .mark_rule(color="#ff4b4b", strokeDash=[5, 5], strokeWidth=2)
@@ -105,9 +167,46 @@ def plot_graph(add_data: str, data: pl.DataFrame):
         st.altair_chart(final_chart, width="stretch")
 
 
-def plot_selected_wind_speed():
-    min_wind_speed = float(st.session_state.forecast_df["wind_speed"].min())
-    max_wind_speed = float(st.session_state.forecast_df["wind_speed"].max())
+def plot_tide_curve(data: pl.DataFrame):
+    # Reads whatever tide table is on disk, the chart never waits for upstream
+    tides = load_cache(TIDES_CACHE_PATH, ttl_seconds=None)
+    if not tides or data.is_empty():
+        return
+    start = datetime.now(timezone.utc).replace(
+        tzinfo=None, minute=0, second=0, microsecond=0
+    )
+    end = datetime.combine(data["date"].max() + timedelta(days=1), datetime.min.time())
+    curve = tide_curve(tides, start, end).with_columns(
+        pl.col("datetime").dt.replace_time_zone("UTC")
+    )
+    has_heights = curve["tide_height"].is_not_null().any()
+    y = (
+        alt.Y("tide_height:Q", title="Altura (m)")
+        if has_heights
+        else alt.Y("tide_percentage:Q", title="Marea (%)")
+    )
+
+    st.header("Marea", divider="rainbow")
+    chart = (
+        alt.Chart(curve)
+        .mark_area(opacity=0.6, interpolate="monotone")
+        .encode(
+            x=alt.X("datetime:T", title="Día y Hora"),
+            y=y,
+            tooltip=[
+                alt.Tooltip("datetime:T", format="%H:%M %d/%m", title="Hora"),
+                alt.Tooltip("tide_height:Q", title="Altura (m)"),
+                alt.Tooltip("tide_percentage:Q", title="Marea (%)"),
+            ],
+        )
+        .properties(width="container", height=250)
+        .interactive()
+    )
+    st.altair_chart(chart, width="stretch")
+
+
+def plot_selected_wind_speed(forecast_filter: ForecastFilter):
+    min_wind_speed, max_wind_speed = map(float, forecast_filter.bounds["wind_speed"])
     default_wind_speed_selection = (min_wind_speed, max_wind_speed)
     return st.slider(
         "Velocidad del viento (nudos)",
@@ -118,9 +217,8 @@ def plot_selected_wind_speed():
     )
 
 
-def plot_selected_wave_energy():
-    min_wave_energy = int(st.session_state.forecast_df["energy"].min())
-    max_wave_energy = int(st.session_state.forecast_df["energy"].max())
+def plot_selected_wave_energy(forecast_filter: ForecastFilter):
+    min_wave_energy, max_wave_energy = map(int, forecast_filter.bounds["energy"])
     if max_wave_energy < DEFAULT_MIN_WAVE_ENERGY:
         default_wave_energy_selection = (0, DEFAULT_MIN_WAVE_ENERGY)
     else:
@@ -134,105 +232,316 @@ def plot_selected_wave_energy():
     )
 
 
-def load_cache(filepath):
-    if not os.path.exists(filepath):
-        return None
-    with open(filepath, "r") as f:
-        data = json.load(f)
-    if time.time() - data["timestamp"] > CACHE_TTL_SECONDS:
-        return None
-    return data["payload"]
-
-
-def save_cache(filepath, payload):
-    with open(filepath, "w") as f:
-        json.dump({"timestamp": time.time(), "payload": payload}, f)
-
-
-def scrape_waves_cached():
-    cached = load_cache(WAVES_CACHE_PATH)
-    if cached is not None:
-        return cached
-    windguru = Windguru()
-    waves_response = windguru.get_waves_from_api(id_spot="49328")
-    rjson = waves_response.json()
-    save_cache(WAVES_CACHE_PATH, rjson)
-    return rjson
-
-
-def scrape_wind_cached():
-    cached = load_cache(WIND_CACHE_PATH)
-    if cached is not None:
-        return cached
-    windguru = Windguru()
-    wind_response = windguru.get_wind_from_api(id_spot="49328")
-    rjson = wind_response.json()
-    save_cache(WIND_CACHE_PATH, rjson)
-    return rjson
-
-
-def scrape_tides_cached():
-    cached = load_cache(TIDES_CACHE_PATH)
-    if cached is not None:
-        return cached
-    tide_scraper = TidesScraperLanzarote()
-    tides = tide_scraper.tasks()
-    save_cache(TIDES_CACHE_PATH, tides)
-    return tides
-
-
-def load_windguru_forecast():
-    waves_data = scrape_waves_cached()
-    wind_data = scrape_wind_cached()
-    tides = scrape_tides_cached()
-    windguru = Windguru()
-    df = windguru.scrape_with_request(waves_data, wind_data, tides)
+def get_windguru():
+    # The pooled client lives for the whole process, so Streamlit reruns and
+    # sessions reuse the same keep-alive connections to windguru.net
+    client = get_http_client(pool_size=HTTP_POOL_SIZE, http2=HTTP2_ENABLED)
+    return Windguru(client=client)
+
+
+def budget_deadline(budget: Optional[float]) -> Optional[float]:
+    return None if budget is None else time.monotonic() + budget
+
+
+def budget_left(deadline: Optional[float]) -> Optional[float]:
+    # Waiting on another process's refresh also spends the budget
+    return None if deadline is None else deadline - time.monotonic()
+
+
+def scrape_model_cached(
+    source: str,
+    id_model: str,
+    id_spot: str,
+    fetch,
+    ahead_seconds: float = 0,
+    budget: Optional[float] = None,
+):
+    windguru = get_windguru()
+    model_run_time = windguru.get_model_run_time()
+    deadline = budget_deadline(budget)
+
+    def fetch_payload(timeout: Optional[float] = None):
+        with span(f"fetch.{source}"):
+            response = fetch(windguru, id_spot, timeout)
+            response.raise_for_status()
+        with span(f"decode.{source}"):
+            rjson = response.json()
+        if "fcst" not in rjson:
+            raise ValueError(f"Windguru returned no {source} forecast for {id_spot}")
+        return rjson
+
+    def refresh():
+        rjson = get_fetcher(source).call(
+            fetch_payload,
+            budget=budget_left(deadline),
+            timeout=FETCH_TIMEOUT_SECONDS[source],
+        )
+        save_model_cache(id_model, id_spot, model_run_time, rjson)
+        return rjson
+
+    return single_flight(
+        model_lock_path(id_model, id_spot),
+        load_fresh=lambda: load_model_cache(
+            id_model, id_spot, model_run_time, now=time.time() + ahead_seconds
+        ),
+        refresh=refresh,
+        load_stale=lambda: load_latest_model_cache(id_model, id_spot),
+    )
+
+
+def scrape_waves_cached(
+    id_spot: str, ahead_seconds: float = 0, budget: Optional[float] = None
+):
+    return scrape_model_cached(
+        "waves",
+        WAVES_MODEL_ID,
+        id_spot,
+        lambda windguru, id_spot, timeout: windguru.get_waves_from_api(
+            id_spot=id_spot, timeout=timeout
+        ),
+        ahead_seconds=ahead_seconds,
+        budget=budget,
+    )
+
+
+def scrape_wind_cached(
+    id_spot: str, ahead_seconds: float = 0, budget: Optional[float] = None
+):
+    return scrape_model_cached(
+        "wind",
+        WIND_MODEL_ID,
+        id_spot,
+        lambda windguru, id_spot, timeout: windguru.get_wind_from_api(
+            id_spot=id_spot, timeout=timeout
+        ),
+        ahead_seconds=ahead_seconds,
+        budget=budget,
+    )
+
+
+def scrape_tides_cached(ahead_seconds: float = 0, budget: Optional[float] = None):
+    deadline = budget_deadline(budget)
+
+    def fetch_tides(timeout: Optional[float] = None):
+        tide_scraper = TidesScraperLanzarote(timeout=timeout)
+        with span("fetch.tides") as fetch_span:
+            scraped_tides = tide_scraper.scrape_tides()
+            fetch_span.rows = len(scraped_tides)
+        if not scraped_tides:
+            raise ValueError("No tides found in the tide table page")
+
+        with span("tides.extend") as extend_span:
+            ingest_tides(scraped_tides)
+            now = time.time()
+            history = load_tides(start=now - TIDE_FIT_DAYS * 86400)
+            tides = tide_scraper.extend_tides(history or scraped_tides)
+            extend_span.rows = len(tides)
+        # The alignment only needs the tides around the forecast window
+        return [
+            tide
+            for tide in tides
+            if tide["timestamp"] >= now - TIDE_WINDOW_PAST_SECONDS
+        ]
+
+    def refresh():
+        tides = get_fetcher("tides").call(
+            fetch_tides,
+            budget=budget_left(deadline),
+            timeout=FETCH_TIMEOUT_SECONDS["tides"],
+        )
+        save_cache(TIDES_CACHE_PATH, tides)
+        return tides
+
+    return single_flight(
+        TIDES_CACHE_PATH,
+        load_fresh=lambda: load_cache(
+            TIDES_CACHE_PATH, now=time.time() + ahead_seconds
+        ),
+        refresh=refresh,
+        load_stale=lambda: load_cache(TIDES_CACHE_PATH, ttl_seconds=None),
+    )
+
+
+@traced("forecast.sources")
+def fetch_forecast_sources(spot_ids: list, ahead_seconds: float = 0):
+    sources = {
+        ("tides", None): (
+            partial(scrape_tides_cached, ahead_seconds=ahead_seconds),
+            lambda: load_cache(TIDES_CACHE_PATH, ttl_seconds=None),
+        )
+    }
+    for id_spot in spot_ids:
+        sources[("waves", id_spot)] = (
+            partial(scrape_waves_cached, id_spot, ahead_seconds=ahead_seconds),
+            lambda id_spot=id_spot: load_latest_model_cache(WAVES_MODEL_ID, id_spot),
+        )
+        sources[("wind", id_spot)] = (
+            partial(scrape_wind_cached, id_spot, ahead_seconds=ahead_seconds),
+            lambda id_spot=id_spot: load_latest_model_cache(WIND_MODEL_ID, id_spot),
+        )
+    return fetch_sources(sources, MAX_CONCURRENT_FETCHES)
+
+
+@traced("forecast.load")
+def load_windguru_forecast(spot_ids: Optional[list] = None, ahead_seconds: float = 0):
+    spot_ids = spot_ids or get_spot_ids()
+    sources = fetch_forecast_sources(spot_ids, ahead_seconds=ahead_seconds)
+    tides = sources[("tides", None)] or []
+    spot_payloads = {}
+    for id_spot in spot_ids:
+        waves_data = sources[("waves", id_spot)]
+        wind_data = sources[("wind", id_spot)]
+        if waves_data is not None and wind_data is not None:
+            spot_payloads[id_spot] = (waves_data, wind_data)
+    if not spot_payloads:
+        return pl.DataFrame()
+    # Identical payloads always build the same frame, so reuse the last build
+    key = frame_cache_key(spot_payloads, tides)
+    df = load_frame_cache(key)
+    if df is None:
+        windguru = get_windguru()
+        with span("forecast.build") as build_span:
+            df = windguru.scrape_spots(spot_payloads, tides)
+            build_span.rows = df.height
+        save_frame_cache(key, df)
     df = final_forecast_format(df)
     return df
 
 
-def render_spot_expanders(filtered_data: pl.DataFrame, section_prefix: str):
-    if filtered_data.is_empty():
-        return
-    now = datetime.now(timezone.utc)
-    spots_ordenados = (
-        filtered_data.group_by("spot_name")
-        .agg(pl.col("datetime").min().alias("proxima_sesion"))
-        .sort("proxima_sesion")["spot_name"]
-        .to_list()
+@st.cache_resource
+def get_forecast_refresher():
+    # One refresher per server process, shared by every session and rerun
+    return ForecastRefresher(load_windguru_forecast).start()
+
+
+def remaining_time_text(first_session_dt: datetime, now: datetime) -> str:
+    if first_session_dt.tzinfo is None:
+        first_session_dt = first_session_dt.replace(tzinfo=timezone.utc)
+
+    diff = first_session_dt - now
+    total_seconds = int(diff.total_seconds())
+
+    if total_seconds <= 0:
+        return "¡Ya está ocurriendo!"
+    dias = total_seconds // 86400
+    horas = (total_seconds % 86400) // 3600
+    minutos = (total_seconds % 3600) // 60
+
+    partes = []
+    if dias > 0:
+        partes.append(f"{dias}d")
+    if horas > 0:
+        partes.append(f"{horas}h")
+    if minutos > 0:
+        partes.append(f"{minutos}min")
+    return f"En {' '.join(partes)}"
+
+
+def frame_hash(df: pl.DataFrame) -> str:
+    return hashlib.sha1(df.hash_rows().to_numpy().tobytes()).hexdigest()
+
+
+def prepare_day_tables(
+    filtered_data: pl.DataFrame,
+) -> Dict[str, Dict[date, pl.DataFrame]]:
+    # One pass over the whole frame: the display strings are built once and
+    # the frame is split by spot and day, in order of the first session
+    day_tables = {}
+    partitions = (
+        filtered_data.sort("datetime")
+        .with_columns(
+            (
+                pl.col("wind_direction").cast(pl.Utf8)
+                + " ("
+                + pl.col("wind_direction_degrees").cast(pl.Utf8)
+                + "º)"
+            ).alias("wind_direction"),
+            (
+                pl.col("wave_direction").cast(pl.Utf8)
+                + " ("
+                + pl.col("wave_direction_degrees").cast(pl.Utf8)
+                + "º)"
+            ).alias("wave_direction"),
+            (
+                pl.col("nearest_tide").cast(pl.Utf8)
+                + " ("
+                + pl.col("tide_percentage").cast(pl.Utf8)
+                + "%)"
+            ).alias("nearest_tide"),
+        )
+        .select(DAY_TABLE_COLUMNS + GRID_ROWS)
+        .partition_by(
+            ["spot_id", "spot_label", "date"], as_dict=True, maintain_order=True
+        )
+    )
+    # Keyed by forecast point too: each spot_id classifies its own rows, so
+    # one spot_name can come from several points at the same hour
+    for (_, spot_label, fecha), group_df in partitions.items():
+        day_tables.setdefault(spot_label, {})[fecha] = group_df
+    return day_tables
+
+
+@st.cache_data(max_entries=GRID_CACHE_ENTRIES, show_spinner=False)
+def build_grid_payload(
+    spot_label: str, fecha: date, filter_hash: str, _group_df: pl.DataFrame
+):
+    # Keyed by what the sidebar filters left for this spot and day; the frame
+    # itself is not hashed by streamlit
+    time_friendly = _group_df["time_friendly"].to_list()
+    # Every cell of the rotated grid is text
+    forecast_to_plot = _group_df.select(pl.col(GRID_ROWS).cast(pl.Utf8))
+
+    forecast_columns = [
+        col.upper().replace("_", " ") for col in forecast_to_plot.columns
+    ]
+    rotated_df = forecast_to_plot.transpose(include_header=False)
+    rotated_df.insert_column(0, pl.Series("PARÁMETROS", forecast_columns))
+    rotated_df_pd = rotated_df.to_pandas()
+
+    gb = GridOptionsBuilder.from_dataframe(rotated_df_pd)
+    gb.configure_default_column(
+        # wrapText=True,
+        # autoHeight=True,
+        columns_auto_size_mode=ColumnsAutoSizeMode.FIT_CONTENTS,
+        suppressMovable=True,
+        sortable=False,
+    )
+    gb.configure_grid_options(domLayout="autoHeight")
+    gb.configure_column(
+        "PARÁMETROS",
+        pinned="left",
+        cellStyle={"fontWeight": "bold", "backgroundColor": "#f8f9fb"},
     )
 
-    for i, spot_name in enumerate(spots_ordenados):
-        spot_df = filtered_data.filter(pl.col("spot_name") == spot_name)
-
-        with st.expander(f"Spot: {spot_name} ({spot_df.height} franjas)"):
-            fechas_disponibles = spot_df["date"].unique().sort()
+    grid_options = gb.build()
+    for idx, col in enumerate(grid_options["columnDefs"][1:]):
+        col["headerName"] = f"{time_friendly[idx]}"
+    # The builder returns nested defaultdicts, which st.cache_data can't pickle
+    return rotated_df_pd, json.loads(json.dumps(grid_options))
 
-            for j, fecha in enumerate(fechas_disponibles):
-                group_df = spot_df.filter(pl.col("date") == fecha).sort("datetime")
 
-                first_session_dt = group_df["datetime"][0]
-                if first_session_dt.tzinfo is None:
-                    first_session_dt = first_session_dt.replace(tzinfo=timezone.utc)
+def render_spot_expanders(filtered_data: pl.DataFrame, section_prefix: str):
+    if filtered_data.is_empty():
+        return
+    now = datetime.now(timezone.utc)
+    day_tables = prepare_day_tables(filtered_data)
 
-                diff = first_session_dt - now
-                total_seconds = int(diff.total_seconds())
+    for spot_label, spot_days in day_tables.items():
+        spot_rows = sum(group_df.height for group_df in spot_days.values())
+        spot_key = f"spot_{section_prefix}_{spot_label}".replace(" ", "_").lower()
 
-                if total_seconds <= 0:
-                    remaining_time_txt = "¡Ya está ocurriendo!"
-                else:
-                    dias = total_seconds // 86400
-                    horas = (total_seconds % 86400) // 3600
-                    minutos = (total_seconds % 3600) // 60
+        # Expanders track their state so closed ones skip their content
+        spot_expander = st.expander(
+            f"Spot: {spot_label} ({spot_rows} franjas)",
+            key=spot_key,
+            on_change="rerun",
+        )
+        if not spot_expander.open:
+            continue
 
-                    partes = []
-                    if dias > 0:
-                        partes.append(f"{dias}d")
-                    if horas > 0:
-                        partes.append(f"{horas}h")
-                    if minutos > 0:
-                        partes.append(f"{minutos}min")
-                    remaining_time_txt = f"En {' '.join(partes)}"
+        with spot_expander:
+            for j, (fecha, group_df) in enumerate(spot_days.items()):
+                remaining_time_txt = remaining_time_text(group_df["datetime"][0], now)
 
                 day_name = group_df["date_name"][0]
                 date_f = group_df["date_friendly"][0]
@@ -243,109 +552,19 @@ def render_spot_expanders(filtered_data: pl.DataFrame, section_prefix: str):
                         f"{date_f} [{group_df.height} franjas] | {remaining_time_txt}"
                     )
 
-                with st.expander(expander_day_phrase):
-                    group_df = group_df.with_columns(
-                        [
-                            (
-                                pl.col("wind_direction")
-                                + " ("
-                                + pl.col("wind_direction_degrees").cast(pl.Utf8)
-                                + "º)"
-                            ).alias("wind_unified"),
-                            (
-                                pl.col("wave_direction")
-                                + " ("
-                                + pl.col("wave_direction_degrees").cast(pl.Utf8)
-                                + "º)"
-                            ).alias("wave_unified"),
-                            (
-                                pl.col("nearest_tide")
-                                + " ("
-                                + pl.col("tide_percentage").cast(pl.Utf8)
-                                + "%)"
-                            ).alias("tide_unified"),
-                        ]
-                    )
-                    time_friendly = group_df["time_friendly"].to_list()
-
-                    forecast_to_plot = (
-                        group_df.drop(
-                            [
-                                "spot_name",
-                                "date",
-                                "time",
-                                "time_graph",
-                                "wind_direction",
-                                "wind_direction_degrees",
-                                "wave_direction",
-                                "wave_direction_degrees",
-                                "date_friendly",
-                                "time_friendly",
-                                "date_name",
-                                "nearest_tide",
-                                "tide_percentage",
-                            ]
-                        )
-                        .sort("datetime")
-                        .rename(
-                            {
-                                "wave_unified": "wave_direction",
-                                "wind_unified": "wind_direction",
-                                "tide_unified": "nearest_tide",
-                            }
-                        )
-                    )
-
-                    forecast_to_plot = forecast_to_plot.drop(["datetime"])
-
-                    order_surf = [
-                        "energy",
-                        "nearest_tide",
-                        "tide",
-                        "wind_direction",
-                        "wind_direction_predominant",
-                        "wave_height",
-                        "wave_period",
-                        "wave_direction",
-                        "wave_direction_predominant",
-                        "wind_speed",
-                    ]
-                    forecast_to_plot = forecast_to_plot.select(order_surf)
-
-                    forecast_columns = [
-                        col.upper().replace("_", " ")
-                        for col in forecast_to_plot.columns
-                    ]
-                    rotated_df = forecast_to_plot.transpose(include_header=False)
-                    rotated_df.insert_column(
-                        0, pl.Series("PARÁMETROS", forecast_columns)
-                    )
-                    rotated_df_pd = rotated_df.to_pandas()
-
-                    gb = GridOptionsBuilder.from_dataframe(rotated_df_pd)
-                    gb.configure_default_column(
-                        # wrapText=True,
-                        # autoHeight=True,
-                        columns_auto_size_mode=ColumnsAutoSizeMode.FIT_CONTENTS,
-                        suppressMovable=True,
-                        sortable=False,
-                    )
-                    gb.configure_grid_options(domLayout="autoHeight")
-                    gb.configure_column(
-                        "PARÁMETROS",
-                        pinned="left",
-                        cellStyle={"fontWeight": "bold", "backgroundColor": "#f8f9fb"},
-                    )
+                unique_key = f"grid_{section_prefix}_{spot_label}_{fecha}_{j}".replace(
+                    " ", "_"
+                ).lower()
+                day_expander = st.expander(
+                    expander_day_phrase, key=f"day_{unique_key}", on_change="rerun"
+                )
+                if not day_expander.open:
+                    continue
 
-                    grid_options = gb.build()
-                    for idx, col in enumerate(grid_options["columnDefs"][1:]):
-                        col["headerName"] = f"{time_friendly[idx]}"
-                    unique_key = (
-                        f"grid_{section_prefix}_{spot_name}_{fecha}_{j}".replace(
-                            " ", "_"
-                        ).lower()
+                with day_expander, span("render.grid", rows=group_df.height):
+                    rotated_df_pd, grid_options = build_grid_payload(
+                        spot_label, fecha, frame_hash(group_df), group_df
                     )
-
                     AgGrid(
                         rotated_df_pd,
                         gridOptions=grid_options,
@@ -355,6 +574,38 @@ def render_spot_expanders(filtered_data: pl.DataFrame, section_prefix: str):
                     )
 
 
+def plot_debug_panel():
+    if not st.toggle("Depuración"):
+        return
+    # Timings are per server process, shared by every session
+    tracer = get_tracer()
+    export = st.checkbox(
+        f"Exportar trazas a {TRACE_EXPORT_PATH}", value=tracer.exporter is not None
+    )
+    if export and tracer.exporter is None:
+        tracer.set_exporter(JsonlExporter(TRACE_EXPORT_PATH))
+    elif not export and tracer.exporter is not None:
+        tracer.set_exporter(None)
+
+    st.caption("Tiempos por etapa (ms, últimas ejecuciones)")
+    st.dataframe(pl.DataFrame(tracer.summary()), hide_index=True)
+    stats = fetch_stats()
+    if stats:
+        st.caption("Descargas")
+        st.dataframe(
+            pl.DataFrame(
+                [{"source": name, **values} for name, values in stats.items()]
+            ),
+            hide_index=True,
+        )
+
+
+@st.cache_resource(max_entries=2, hash_funcs={pl.DataFrame: id})
+def get_forecast_filter(forecast: pl.DataFrame) -> ForecastFilter:
+    # One engine per forecast frame the refresher swaps in
+    return ForecastFilter(forecast)
+
+
 def plot_forecast_as_table():
     st.set_page_config(layout="wide")
     st.markdown(
@@ -364,24 +615,17 @@ def plot_forecast_as_table():
 
     st.title("LANZAROTE (WAVEFINDER)")
 
-    retries = 0
-    while retries <= RETRIES:
-        initial_forecast = load_windguru_forecast()
-        if not initial_forecast.is_empty():
-            break
-        else:
-            retries += 1
-    if retries > RETRIES:
+    # Retries, backoff and the stale cache fallback live in the fetchers
+    initial_forecast = get_forecast_refresher().get_forecast()
+    if initial_forecast.is_empty():
         st.error("No se pudo obtener el forecast")
         return
 
     st.session_state.forecast_df = initial_forecast
-    scraped_datetime_list = list(
-        set(st.session_state.forecast_df["datetime"].to_list())
-    )
-    scraped_date_list = set([date.date() for date in scraped_datetime_list])
-    date_name_list = list(set(st.session_state.forecast_df["date_name"].to_list()))
-    all_beaches = list(set(st.session_state.forecast_df["spot_name"].to_list()))
+    forecast_filter = get_forecast_filter(initial_forecast)
+    scraped_date_list = forecast_filter.categories["date"]
+    date_name_list = forecast_filter.categories["date_name"]
+    all_beaches = forecast_filter.categories["spot_name"]
 
     with st.sidebar:
         st.header("Filtros de Forecast")
@@ -395,9 +639,10 @@ def plot_forecast_as_table():
             "Rango de fechas", (today, next_days), today, next_days, format="DD/MM/YYYY"
         )
 
-        selected_wave_energy = plot_selected_wave_energy()
-        selected_wind_speed = plot_selected_wind_speed()
+        selected_wave_energy = plot_selected_wave_energy(forecast_filter)
+        selected_wind_speed = plot_selected_wind_speed(forecast_filter)
         beach_selection = st.multiselect("Playa:", all_beaches, default=all_beaches)
+        plot_debug_panel()
 
     date_selection = []
     if len(selected_date_range_datetime) == 2:
@@ -409,17 +654,15 @@ def plot_forecast_as_table():
     if not date_selection:
         date_selection = scraped_date_list
 
-    df = st.session_state.forecast_df
-    mask = (
-        df["date"].is_in(date_selection)
-        & df["date_name"].is_in(date_name_selection)
-        & df["spot_name"].is_in(beach_selection)
-        & (df["wind_speed"] >= selected_wind_speed[0])
-        & (df["wind_speed"] <= selected_wind_speed[1])
-        & (df["energy"] >= selected_wave_energy[0])
-        & (df["energy"] <= selected_wave_energy[1])
-    )
-    data = df.filter(mask)
+    with span("render.filter") as filter_span:
+        data = forecast_filter.filter(
+            date_selection,
+            date_name_selection,
+            beach_selection,
+            selected_wind_speed,
+            selected_wave_energy,
+        )
+        filter_span.rows = data.height
 
     # TODO put in a method
     if not data.is_empty():
@@ -513,6 +756,9 @@ def plot_forecast_as_table():
                     delta_arrow="off",
                 )
 
+    if st.toggle("Curva de marea (cada 10 min)"):
+        plot_tide_curve(data)
+
     data_north = data.filter(~pl.col("wave_direction").is_in(["W", "WNW"]))
     data_west = data.filter(pl.col("wave_direction").is_in(["W", "WNW"]))
 
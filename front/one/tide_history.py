@@ -0,0 +1,104 @@
+import glob
+import os
+from datetime import datetime
+from typing import Dict, List, Optional
+
+import polars as pl
+
+from front.one.cache import FileLock, atomic_path
+
+TIDE_HISTORY_DIR = "data/tides"
+TIDE_HISTORY_PATH = "{directory}/tides_{month}.parquet"
+TIDE_HISTORY_SCHEMA = {
+    "tide": pl.Utf8,
+    "timestamp": pl.Float64,
+    "height": pl.Float64,
+    "datetime": pl.Utf8,
+}
+
+
+def month_of(timestamp: float) -> str:
+    return datetime.fromtimestamp(timestamp).strftime("%Y-%m")
+
+
+def partition_path(month: str, directory: Optional[str] = None) -> str:
+    return TIDE_HISTORY_PATH.format(
+        directory=directory or TIDE_HISTORY_DIR, month=month
+    )
+
+
+def list_partitions(directory: Optional[str] = None) -> List[str]:
+    return sorted(glob.glob(partition_path("*", directory)))
+
+
+def read_partition(filepath: str) -> pl.DataFrame:
+    if not os.path.exists(filepath):
+        return pl.DataFrame(schema=TIDE_HISTORY_SCHEMA)
+    return pl.read_parquet(filepath)
+
+
+def last_timestamp(directory: Optional[str] = None) -> Optional[float]:
+    partitions = list_partitions(directory)
+    if not partitions:
+        return None
+    return read_partition(partitions[-1])["timestamp"].max()
+
+
+def ingest_tides(tides: List[Dict], directory: Optional[str] = None) -> int:
+    # Append-only: rows at or before the last stored tide are never rewritten,
+    # and extrapolated tides (no height) are not history
+    directory = directory or TIDE_HISTORY_DIR
+    with FileLock(os.path.join(directory, "ingest")):
+        last = last_timestamp(directory)
+        new_tides = {
+            tide["timestamp"]: tide
+            for tide in tides
+            if tide.get("height") is not None
+            and (last is None or tide["timestamp"] > last)
+        }
+        if not new_tides:
+            return 0
+
+        rows = pl.DataFrame(
+            [
+                {name: tide[name] for name in TIDE_HISTORY_SCHEMA}
+                for tide in new_tides.values()
+            ],
+            schema=TIDE_HISTORY_SCHEMA,
+        ).sort("timestamp")
+        months = [month_of(timestamp) for timestamp in rows["timestamp"]]
+        for (month,), month_rows in rows.with_columns(
+            pl.Series("month", months)
+        ).group_by("month"):
+            filepath = partition_path(month, directory)
+            partition = pl.concat(
+                [read_partition(filepath), month_rows.drop("month")]
+            ).sort("timestamp")
+            with atomic_path(filepath) as tmp_path:
+                partition.write_parquet(tmp_path)
+        return rows.height
+
+
+def load_tides(
+    start: Optional[float] = None,
+    end: Optional[float] = None,
+    directory: Optional[str] = None,
+) -> List[Dict]:
+    # Only the monthly files that overlap the window are scanned
+    first_month = month_of(start) if start is not None else None
+    last_month = month_of(end) if end is not None else None
+    partitions = [
+        filepath
+        for filepath in list_partitions(directory)
+        if (first_month is None or filepath >= partition_path(first_month, directory))
+        and (last_month is None or filepath <= partition_path(last_month, directory))
+    ]
+    if not partitions:
+        return []
+
+    window = pl.scan_parquet(partitions)
+    if start is not None:
+        window = window.filter(pl.col("timestamp") >= start)
+    if end is not None:
+        window = window.filter(pl.col("timestamp") <= end)
+    return window.sort("timestamp").collect().to_dicts()
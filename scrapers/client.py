@@ -0,0 +1,78 @@
+import threading
+from typing import Dict, Optional
+
+import requests
+from curl_cffi import Session
+from requests.adapters import HTTPAdapter
+
+try:
+    import h2  # noqa: F401
+    import httpx
+except ImportError:
+    httpx = None
+
+DEFAULT_POOL_SIZE = 10
+
+_lock = threading.Lock()
+_http_client = None
+_impersonating_session = None
+
+
+class HttpClient:
+    def __init__(
+        self,
+        pool_size: int = DEFAULT_POOL_SIZE,
+        http2: bool = False,
+        headers: Optional[Dict[str, str]] = None,
+    ):
+        self.pool_size = pool_size
+        # HTTP/2 needs the optional httpx[http2] extra, otherwise keep-alive
+        # HTTP/1.1 connections are pooled with requests
+        self.http2 = http2 and httpx is not None
+        if self.http2:
+            self.session = httpx.Client(
+                http2=True,
+                headers=headers,
+                limits=httpx.Limits(
+                    max_connections=pool_size, max_keepalive_connections=pool_size
+                ),
+            )
+        else:
+            self.session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+            self.session.mount("http://", adapter)
+            self.session.mount("https://", adapter)
+            if headers:
+                self.session.headers.update(headers)
+
+    def get(
+        self,
+        url: str,
+        params: Optional[dict] = None,
+        headers: Optional[dict] = None,
+        timeout: Optional[float] = None,
+    ):
+        return self.session.get(url, params=params, headers=headers, timeout=timeout)
+
+    def close(self):
+        self.session.close()
+
+
+def get_http_client(
+    pool_size: int = DEFAULT_POOL_SIZE, http2: bool = False
+) -> HttpClient:
+    # One client per process, the first caller decides its configuration
+    global _http_client
+    with _lock:
+        if _http_client is None:
+            _http_client = HttpClient(pool_size=pool_size, http2=http2)
+        return _http_client
+
+
+def get_impersonating_session() -> Session:
+    # curl_cffi keeps one curl handle per thread, so the session can be shared
+    global _impersonating_session
+    with _lock:
+        if _impersonating_session is None:
+            _impersonating_session = Session()
+        return _impersonating_session
@@ -0,0 +1,172 @@
+import random
+import threading
+import time
+from typing import Callable, Dict, Optional
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+# A retry is not worth starting with less time than this left in the budget
+MIN_ATTEMPT_SECONDS = 1.0
+
+_lock = threading.Lock()
+_fetchers = {}
+
+
+class CircuitOpenError(Exception):
+    pass
+
+
+class RetryPolicy:
+    def __init__(
+        self,
+        max_attempts: int = 3,
+        base_delay: float = 1.0,
+        max_delay: float = 10.0,
+        sleep: Callable[[float], None] = time.sleep,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.sleep = sleep
+        self.clock = clock
+
+    def delay(self, attempt: int) -> float:
+        # Full jitter: anywhere between 0 and the exponential backoff cap
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2**attempt))
+
+    def max_total_delay(self) -> float:
+        return sum(
+            min(self.max_delay, self.base_delay * 2**attempt)
+            for attempt in range(self.max_attempts - 1)
+        )
+
+
+class CircuitBreaker:
+    def __init__(
+        self,
+        failure_threshold: int = 3,
+        reset_timeout: float = 300,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.clock = clock
+        self.state = CLOSED
+        self.consecutive_failures = 0
+        self.opened_at: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self.state == OPEN:
+                if self.clock() - self.opened_at < self.reset_timeout:
+                    return False
+                # Let one probe through after the cool-down
+                self.state = HALF_OPEN
+                return True
+            return self.state == CLOSED
+
+    def record_success(self):
+        with self._lock:
+            self.state = CLOSED
+            self.consecutive_failures = 0
+            self.opened_at = None
+
+    def record_failure(self):
+        with self._lock:
+            self.consecutive_failures += 1
+            if (
+                self.state == HALF_OPEN
+                or self.consecutive_failures >= self.failure_threshold
+            ):
+                self.state = OPEN
+                self.opened_at = self.clock()
+
+
+class ResilientFetcher:
+    def __init__(
+        self,
+        name: str,
+        policy: Optional[RetryPolicy] = None,
+        breaker: Optional[CircuitBreaker] = None,
+    ):
+        self.name = name
+        self.policy = policy or RetryPolicy()
+        self.breaker = breaker or CircuitBreaker()
+        self.counters = {
+            "calls": 0,
+            "attempts": 0,
+            "failures": 0,
+            "successes": 0,
+            "short_circuited": 0,
+        }
+        self._lock = threading.Lock()
+
+    def _count(self, counter: str):
+        with self._lock:
+            self.counters[counter] += 1
+
+    def call(
+        self,
+        fetch: Callable,
+        *args,
+        budget: Optional[float] = None,
+        timeout: Optional[float] = None,
+        **kwargs,
+    ):
+        # budget is the time left for the whole call, backoff included. Each
+        # attempt gets timeout= cut to what is left, and a retry only starts
+        # when it still has MIN_ATTEMPT_SECONDS after its backoff.
+        self._count("calls")
+        if budget is not None and budget <= 0:
+            raise TimeoutError(f"No time left to fetch {self.name}")
+        if not self.breaker.allow():
+            self._count("short_circuited")
+            raise CircuitOpenError(f"Circuit for {self.name} is open")
+
+        deadline = None if budget is None else self.policy.clock() + budget
+        for attempt in range(self.policy.max_attempts):
+            if deadline is not None:
+                remaining = deadline - self.policy.clock()
+                kwargs["timeout"] = (
+                    remaining if timeout is None else min(timeout, remaining)
+                )
+            elif timeout is not None:
+                kwargs["timeout"] = timeout
+            self._count("attempts")
+            try:
+                result = fetch(*args, **kwargs)
+            except Exception:
+                self._count("failures")
+                delay = self.policy.delay(attempt)
+                out_of_time = (
+                    deadline is not None
+                    and self.policy.clock() + delay + MIN_ATTEMPT_SECONDS > deadline
+                )
+                if attempt == self.policy.max_attempts - 1 or out_of_time:
+                    self.breaker.record_failure()
+                    raise
+                self.policy.sleep(delay)
+            else:
+                self._count("successes")
+                self.breaker.record_success()
+                return result
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {**self.counters, "state": self.breaker.state}
+
+
+def get_fetcher(name: str) -> ResilientFetcher:
+    with _lock:
+        if name not in _fetchers:
+            _fetchers[name] = ResilientFetcher(name)
+        return _fetchers[name]
+
+
+def fetch_stats() -> Dict[str, Dict]:
+    with _lock:
+        fetchers = dict(_fetchers)
+    return {name: fetcher.stats() for name, fetcher in fetchers.items()}
@@ -0,0 +1,126 @@
+from datetime import datetime
+from typing import Dict, List, Optional
+
+import numpy as np
+
+# Angular speeds of the main constituents, in degrees per hour
+CONSTITUENTS = {
+    "M2": 28.9841042,
+    "S2": 30.0,
+    "N2": 28.4397295,
+    "K1": 15.0410686,
+    "O1": 13.9430356,
+}
+# With less than about a week of extremes the fit drifts more than the fixed
+# 6h12m30s step it replaces
+MIN_FIT_EXTREMES = 26
+# Keeps the constituents the history can't resolve yet (S2 against M2 before a
+# full spring-neap cycle) from blowing up on noisy scraped times
+RIDGE = 1e-3
+# The slope rows are in m/h; this brings them to the same scale as heights
+SLOPE_WEIGHT = 2.0
+PREDICTION_STEP_SECONDS = 600
+HIGH_TIDE = "pleamar"
+LOW_TIDE = "bajamar"
+
+
+class HarmonicTideModel:
+    def __init__(
+        self,
+        coefficients: np.ndarray,
+        epoch: float,
+        speeds: Optional[np.ndarray] = None,
+    ):
+        self.coefficients = coefficients
+        self.epoch = epoch
+        self.speeds = (
+            speeds
+            if speeds is not None
+            else np.radians(np.array(list(CONSTITUENTS.values())))
+        )
+
+    @classmethod
+    def fit(
+        cls, tides: List[Dict], ridge: float = RIDGE
+    ) -> Optional["HarmonicTideModel"]:
+        # Extremes give two equations each: the height, and a zero slope
+        observed = [tide for tide in tides if tide.get("height") is not None]
+        if len(observed) < MIN_FIT_EXTREMES:
+            return None
+        timestamps = np.array([tide["timestamp"] for tide in observed], dtype=float)
+        heights = np.array([tide["height"] for tide in observed], dtype=float)
+        epoch = float(timestamps[0])
+        speeds = np.radians(np.array(list(CONSTITUENTS.values())))
+
+        hours = (timestamps - epoch) / 3600
+        phase = np.outer(hours, speeds)
+        cos, sin = np.cos(phase), np.sin(phase)
+        ones = np.ones((len(hours), 1))
+        height_rows = np.hstack([ones, cos, sin])
+        slope_rows = SLOPE_WEIGHT * np.hstack(
+            [np.zeros((len(hours), 1)), -speeds * sin, speeds * cos]
+        )
+        design = np.vstack([height_rows, slope_rows])
+        target = np.concatenate([heights, np.zeros(len(hours))])
+
+        # The mean level is not penalised, only the constituent amplitudes
+        penalty = np.full(design.shape[1], ridge * len(hours))
+        penalty[0] = 0
+        coefficients = np.linalg.solve(
+            design.T @ design + np.diag(penalty), design.T @ target
+        )
+        return cls(coefficients, epoch, speeds)
+
+    def _phase(self, timestamps) -> np.ndarray:
+        hours = (np.asarray(timestamps, dtype=float) - self.epoch) / 3600
+        return np.multiply.outer(hours, self.speeds)
+
+    def heights(self, timestamps) -> np.ndarray:
+        n = len(self.speeds)
+        phase = self._phase(timestamps)
+        return (
+            self.coefficients[0]
+            + np.cos(phase) @ self.coefficients[1 : n + 1]
+            + np.sin(phase) @ self.coefficients[n + 1 :]
+        )
+
+    def slopes(self, timestamps) -> np.ndarray:
+        # Metres per hour
+        n = len(self.speeds)
+        phase = self._phase(timestamps)
+        cos_rates = -self.speeds * self.coefficients[1 : n + 1]
+        sin_rates = self.speeds * self.coefficients[n + 1 :]
+        return np.sin(phase) @ cos_rates + np.cos(phase) @ sin_rates
+
+    def curve(
+        self, start: float, end: float, step_seconds: float = PREDICTION_STEP_SECONDS
+    ):
+        timestamps = np.arange(start, end + step_seconds, step_seconds, dtype=float)
+        return timestamps, self.heights(timestamps)
+
+    def extremes(
+        self, start: float, end: float, step_seconds: float = PREDICTION_STEP_SECONDS
+    ) -> List[Dict]:
+        timestamps = np.arange(start, end + step_seconds, step_seconds, dtype=float)
+        slopes = self.slopes(timestamps)
+        # A high tide is where the slope goes from rising to falling
+        crossing = np.flatnonzero(np.sign(slopes[:-1]) != np.sign(slopes[1:]))
+        crossing = crossing[slopes[crossing] != 0]
+        fraction = slopes[crossing] / (slopes[crossing] - slopes[crossing + 1])
+        extreme_timestamps = timestamps[crossing] + fraction * step_seconds
+        extreme_heights = self.heights(extreme_timestamps)
+        is_high = slopes[crossing] > 0
+
+        return [
+            {
+                "tide": HIGH_TIDE if high else LOW_TIDE,
+                "timestamp": float(timestamp),
+                "height": round(float(height), 2),
+                "datetime": datetime.fromtimestamp(timestamp).isoformat(),
+            }
+            # Rounded to the minute, like the scraped tide table
+            for timestamp, height, high in zip(
+                np.round(extreme_timestamps / 60) * 60, extreme_heights, is_high
+            )
+            if start < timestamp <= end
+        ]
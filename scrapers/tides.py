@@ -1,71 +1,152 @@
 import re
 from datetime import datetime, timedelta
-from typing import Dict, List
+from typing import Dict, List, Optional
 
 import polars as pl
 from bs4 import BeautifulSoup
 from curl_cffi import Session
 
+from scrapers.client import get_impersonating_session
+from scrapers.tide_harmonics import HarmonicTideModel
+
+try:
+    from lxml import etree
+    from lxml import html as lxml_html
+except ImportError:
+    lxml_html = None
+
+TIDE_ROW_CLASS = "tabla_mareas_fila_fondo"
+DATE_PATTERN = re.compile(r"(\d{4}-\d{2}-\d{1,2})")
+
+
+def _class_token(name: str) -> str:
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')"
+
+
+if lxml_html is not None:
+    # Same selectors as the bs4 version: the row class is a substring match,
+    # the cell classes must be one of the element's class tokens
+    _rows_xpath = etree.XPath(f"//tr[contains(@class, '{TIDE_ROW_CLASS}')]")
+    _cells_xpath = etree.XPath(f".//td[{_class_token('tabla_mareas_marea')}]")
+    _hora_xpath = etree.XPath(f".//div[{_class_token('tabla_mareas_marea_hora')}][1]")
+    _tipo_xpath = etree.XPath(
+        f".//div[{_class_token('tabla_mareas_marea_bajamar_pleamar')}][1]"
+    )
+    _altura_xpath = etree.XPath(
+        f".//span[{_class_token('tabla_mareas_marea_altura_numero')}][1]"
+    )
+
+
+def _first(elements):
+    return elements[0] if elements else None
+
+
+def _tide_record(
+    date_str: str, hora_raw: str, tipo: str, altura: Optional[str]
+) -> Dict:
+    full_dt = datetime.strptime(f"{date_str} {hora_raw}", "%Y-%m-%d %H:%M")
+    return {
+        "tide": tipo,
+        "timestamp": full_dt.timestamp(),
+        # A tide without its height stays unknown rather than 0 m
+        "height": float(altura) if altura is not None else None,
+        "datetime": full_dt.isoformat(),
+    }
+
+
+def parse_tides_lxml(page: str) -> List[Dict]:
+    tides_data = []
+    for row in _rows_xpath(lxml_html.fromstring(page)):
+        date_match = DATE_PATTERN.search(row.get("onclick", ""))
+        if not date_match:
+            continue
+
+        current_date_str = date_match.group(1)
+        for cell in _cells_xpath(row):
+            hora_div = _first(_hora_xpath(cell))
+            if hora_div is None:
+                continue
+            hora_text = hora_div.text_content()
+            if not hora_text.strip():
+                continue
+            hora_raw = hora_text.replace("h", "").strip()
+
+            tipo_div = _first(_tipo_xpath(cell))
+            tipo = (
+                "bajamar"
+                if "tabla_mareas_marea_bajamar" in tipo_div.get("class", "").split()
+                else "pleamar"
+            )
+
+            altura_span = _first(_altura_xpath(cell))
+            altura = (
+                altura_span.text_content().replace(",", ".")
+                if altura_span is not None
+                else None
+            )
+            tides_data.append(_tide_record(current_date_str, hora_raw, tipo, altura))
+    tides_data.sort(key=lambda x: x["timestamp"])
+    return tides_data
+
+
+def parse_tides_bs4(page: str) -> List[Dict]:
+    soup = BeautifulSoup(page, "html.parser")
+    tides_data = []
+    rows = soup.find_all("tr", class_=re.compile(TIDE_ROW_CLASS))
+
+    for row in rows:
+        onclick = row.get("onclick", "")
+        date_match = DATE_PATTERN.search(onclick)
+
+        if not date_match:
+            continue
+
+        current_date_str = date_match.group(1)
+        marea_cells = row.find_all("td", class_="tabla_mareas_marea")
+
+        for cell in marea_cells:
+            hora_div = cell.find("div", class_="tabla_mareas_marea_hora")
+            if not hora_div or not hora_div.text.strip():
+                continue
+            hora_raw = hora_div.text.replace("h", "").strip()
+
+            tipo_div = cell.find("div", class_="tabla_mareas_marea_bajamar_pleamar")
+            tipo = (
+                "bajamar"
+                if "tabla_mareas_marea_bajamar" in tipo_div.get("class", [])
+                else "pleamar"
+            )
+
+            altura_span = cell.find("span", class_="tabla_mareas_marea_altura_numero")
+            altura = altura_span.text.replace(",", ".") if altura_span else None
+            tides_data.append(_tide_record(current_date_str, hora_raw, tipo, altura))
+    tides_data.sort(key=lambda x: x["timestamp"])
+    return tides_data
+
+
+def parse_tides(page: str) -> List[Dict]:
+    if lxml_html is not None:
+        return parse_tides_lxml(page)
+    return parse_tides_bs4(page)
+
 
 class TidesScraperLanzarote:
-    def __init__(self):
+    def __init__(self, timeout: float = 30, session: Optional[Session] = None):
         # URL específica de Arrecife, Lanzarote
         self.link = "https://tablademareas.com/es/islas-canarias/arrecife-lanzarote"
-        self.session = Session()
+        self.session = session or get_impersonating_session()
+        self.timeout = timeout
 
     def _clean_text(self, text: str) -> str:
         return text.replace("h", "").strip()
 
     def scrape_tides(self) -> List[Dict]:
-        response = self.session.get(url=self.link, impersonate="chrome131")
+        response = self.session.get(
+            url=self.link, impersonate="chrome131", timeout=self.timeout
+        )
         if response.status_code != 200:
             return []
-
-        soup = BeautifulSoup(response.text, "html.parser")
-        tides_data = []
-        rows = soup.find_all("tr", class_=re.compile(r"tabla_mareas_fila_fondo"))
-
-        for row in rows:
-            onclick = row.get("onclick", "")
-            date_match = re.search(r"(\d{4}-\d{2}-\d{1,2})", onclick)
-
-            if not date_match:
-                continue
-
-            current_date_str = date_match.group(1)
-            marea_cells = row.find_all("td", class_="tabla_mareas_marea")
-
-            for cell in marea_cells:
-                hora_div = cell.find("div", class_="tabla_mareas_marea_hora")
-                if not hora_div or not hora_div.text.strip():
-                    continue
-                hora_raw = hora_div.text.replace("h", "").strip()
-
-                tipo_div = cell.find("div", class_="tabla_mareas_marea_bajamar_pleamar")
-                tipo = (
-                    "bajamar"
-                    if "tabla_mareas_marea_bajamar" in tipo_div.get("class", [])
-                    else "pleamar"
-                )
-
-                altura_span = cell.find(
-                    "span", class_="tabla_mareas_marea_altura_numero"
-                )
-                altura = altura_span.text.replace(",", ".") if altura_span else "0"
-                full_dt = datetime.strptime(
-                    f"{current_date_str} {hora_raw}", "%Y-%m-%d %H:%M"
-                )
-
-                tides_data.append(
-                    {
-                        "tide": tipo,
-                        "timestamp": full_dt.timestamp(),
-                        "height": float(altura),
-                        "datetime": full_dt.isoformat(),
-                    }
-                )
-        tides_data.sort(key=lambda x: x["timestamp"])
-        return tides_data
+        return parse_tides(response.text)
 
     def construct_future_tides(
         self, tides: List[Dict], days_to_extend: int = 15
@@ -73,6 +154,10 @@ class TidesScraperLanzarote:
         if not tides:
             return []
 
+        model = HarmonicTideModel.fit(tides)
+        if model is not None:
+            return tides + self.predict_future_tides(model, tides, days_to_extend)
+
         tide_interval = timedelta(hours=6, minutes=12, seconds=30)
         last_tide = tides[-1]
 
@@ -95,11 +180,27 @@ class TidesScraperLanzarote:
             )
         return tides
 
+    def predict_future_tides(
+        self, model: HarmonicTideModel, tides: List[Dict], days_to_extend: int
+    ) -> List[Dict]:
+        last_tide = tides[-1]
+        # Skip the prediction of the last scraped tide itself, so the series
+        # keeps alternating
+        start_ts = last_tide["timestamp"] + 3 * 3600
+        predicted = model.extremes(
+            start_ts, last_tide["timestamp"] + days_to_extend * 86400
+        )
+        while predicted and predicted[0]["tide"] == last_tide["tide"]:
+            predicted.pop(0)
+        return predicted
+
     def get_tides_dataframe(self, tides: List[Dict]) -> pl.DataFrame:
         return pl.DataFrame(tides)
 
-    def tasks(self):
-        tides = self.scrape_tides()
-        tides = self.construct_future_tides(tides)
+    def extend_tides(self, tides: List[Dict]) -> List[Dict]:
+        tides = self.construct_future_tides(list(tides))
         unique_tides = {t["timestamp"]: t for t in tides}.values()
         return sorted(list(unique_tides), key=lambda x: x["timestamp"])
+
+    def tasks(self):
+        return self.extend_tides(self.scrape_tides())
@@ -1,30 +1,58 @@
 from datetime import datetime, timezone
+from typing import Optional
 import polars as pl
+from scrapers.client import HttpClient, get_http_client
+from forecast_schema import compact_forecast
+from spot_classifier import classify_spots
+from tide_index import generate_tide_columns
+from tracing import span
 from utils import (
-    generate_tides,
-    generate_nearest_tides,
-    generate_tide_percentages,
-    generate_energy,
-    create_date_name_column,
-    create_direction_predominant_column,
-    generate_spot_names,
-    datetime_to_frontend_str,
-    degrees_to_direction,
-    generate_forecast_moments,
-    ammend_wave_directions,
-    clean_list,
-    align_dict_columns,
+    compass_expr,
+    display_hours_expr,
+    predominant_expr,
+    wave_compass_expr,
+    wave_energy_expr,
 )
 import locale
-import requests
-import math
 
 locale.setlocale(locale.LC_TIME, "es_ES.UTF-8")
 
 
+WINDGURU_API_URL = "https://www.windguru.net/int/iapi.php"
+WINDGURU_HEADERS = {
+    "sec-ch-ua-platform": '"Windows"',
+    "Referer": "https://www.windguru.cz/",
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/131.0.0.0 Safari/537.36",
+    "sec-ch-ua": '"Google Chrome";v="131", "Chromium";v="131", "Not_A Brand";v="24"',
+    "sec-ch-ua-mobile": "?0",
+}
+WIND_MODEL_ID = "3"
+WAVES_MODEL_ID = "84"
+FORECAST_COLUMNS = [
+    "wind_speed",
+    "wind_direction_degrees",
+    "wave_height",
+    "wave_direction_degrees",
+    "wave_period",
+    "datetime",
+    "wind_direction_predominant",
+    "wind_direction",
+    "wave_direction_predominant",
+    "wave_direction",
+    "energy",
+]
+
+
 class Windguru(object):
-    def __init__(self):
-        pass
+    def __init__(self, client: Optional[HttpClient] = None):
+        self.client = client or get_http_client()
+
+    def get_model_run_time(self, now: Optional[datetime] = None) -> datetime:
+        now_dt = now or datetime.now(timezone.utc)
+
+        if now_dt.hour >= 12:
+            return now_dt.replace(hour=12, minute=0, second=0, microsecond=0)
+        return now_dt.replace(hour=0, minute=0, second=0, microsecond=0)
 
     def generate_rundef(
         self,
@@ -32,117 +60,131 @@ class Windguru(object):
         forecast_end=240,
         long_range_start=243,
         long_range_end=384,
+        now: Optional[datetime] = None,
     ):
-        now_dt = datetime.now(timezone.utc)
-
-        if now_dt.hour >= 12:
-            model_run_time = now_dt.replace(hour=12, minute=0, second=0, microsecond=0)
-        else:
-            model_run_time = now_dt.replace(hour=0, minute=0, second=0, microsecond=0)
+        model_run_time = self.get_model_run_time(now)
         init_time_str = model_run_time.strftime("%Y%m%d%H")
         rundef = f"{init_time_str}x{forecast_start}x{forecast_end}x{forecast_start}x{forecast_end}-{init_time_str}x{long_range_start}x{long_range_end}x{long_range_start}x{long_range_end}"
 
         return rundef
 
-    def get_wind_from_api(self, id_spot: str):
-        rundef = self.generate_rundef()
-        headers = {
-            "sec-ch-ua-platform": '"Windows"',
-            "Referer": "https://www.windguru.cz/",
-            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/131.0.0.0 Safari/537.36",
-            "sec-ch-ua": '"Google Chrome";v="131", "Chromium";v="131", "Not_A Brand";v="24"',
-            "sec-ch-ua-mobile": "?0",
-        }
-
-        params = {
-            "q": "forecast",
-            "id_model": "3",
-            "rundef": rundef,
-            "id_spot": id_spot,
-            "WGCACHEABLE": "21600",
-            "cachefix": "29.123x-13.542x-1",
-        }
-
-        return requests.get(
-            "https://www.windguru.net/int/iapi.php", params=params, headers=headers
+    def get_wind_from_api(self, id_spot: str, timeout: Optional[float] = None):
+        return self.get_forecast_from_api(
+            id_model=WIND_MODEL_ID,
+            id_spot=id_spot,
+            cachefix="29.123x-13.542x-1",
+            timeout=timeout,
         )
 
-    def get_waves_from_api(self, id_spot: str):
-        rundef = self.generate_rundef()
-        headers = {
-            "sec-ch-ua-platform": '"Windows"',
-            "Referer": "https://www.windguru.cz/",
-            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/131.0.0.0 Safari/537.36",
-            "sec-ch-ua": '"Google Chrome";v="131", "Chromium";v="131", "Not_A Brand";v="24"',
-            "sec-ch-ua-mobile": "?0",
-        }
+    def get_waves_from_api(self, id_spot: str, timeout: Optional[float] = None):
+        return self.get_forecast_from_api(
+            id_model=WAVES_MODEL_ID,
+            id_spot=id_spot,
+            cachefix="29.209x-13.676x-1",
+            timeout=timeout,
+        )
 
+    def get_forecast_from_api(
+        self,
+        id_model: str,
+        id_spot: str,
+        cachefix: str,
+        timeout: Optional[float] = None,
+    ):
         params = {
             "q": "forecast",
-            "id_model": "84",
-            "rundef": rundef,
+            "id_model": id_model,
+            "rundef": self.generate_rundef(),
             "id_spot": id_spot,
             "WGCACHEABLE": "21600",
-            "cachefix": "29.209x-13.676x-1",
+            "cachefix": cachefix,
         }
 
-        return requests.get(
-            "https://www.windguru.net/int/iapi.php", params=params, headers=headers
+        return self.client.get(
+            WINDGURU_API_URL,
+            params=params,
+            headers=WINDGURU_HEADERS,
+            timeout=timeout,
         )
 
     def scrape_with_request(self, waves_data: dict, wind_data: dict, tides: dict):
-        forecast = {}
-        wind_speed = clean_list(wind_data.get("fcst").get("WINDSPD"))
-        wind_direction_degrees = clean_list(wind_data.get("fcst").get("WINDDIR"))
-        wave_height = clean_list(waves_data.get("fcst").get("HTSGW"))
-        wave_direction_degrees = clean_list(waves_data.get("fcst").get("DIRPW"))
-        wave_period = clean_list(waves_data.get("fcst").get("PERPW"))
-        initstamp = int(wind_data.get("fcst").get("initstamp"))
-        hours = wind_data.get("fcst").get("hours")
-
-        moments = generate_forecast_moments(initstamp, hours)
-
-        forecast["wind_speed"] = [math.ceil(element) for element in wind_speed]
-        forecast["wind_direction_degrees"] = wind_direction_degrees
-        forecast["wave_height"] = [math.ceil(element) for element in wave_height]
-        forecast["wave_direction_degrees"] = wave_direction_degrees
-        forecast["wave_period"] = [math.ceil(element) for element in wave_period]
-        forecast["datetime"] = moments
-        forecast["date"] = [moment.date() for moment in moments]
-        forecast["date_friendly"] = [
-            datetime_to_frontend_str(moment) for moment in moments
-        ]
-        forecast["time"] = [moment.time() for moment in moments]
-        time_friendly = [moment.strftime("%H:%M") for moment in moments]
-        forecast["time_friendly"] = time_friendly
-        forecast["time_graph"] = [
-            element.replace(":", r"\:") for element in time_friendly
-        ]
-
-        forecast["wind_direction_predominant"] = create_direction_predominant_column(
-            wind_direction_degrees
-        )
-        forecast["wind_direction"] = [
-            degrees_to_direction(element) for element in wind_direction_degrees
-        ]
-        forecast["wave_direction_predominant"] = create_direction_predominant_column(
-            wave_direction_degrees
-        )
-        wave_directions = [
-            degrees_to_direction(element) for element in wave_direction_degrees
+        forecast = self.build_forecast(waves_data, wind_data).collect()
+        return self.classify_forecast(forecast, tides)
+
+    def scrape_spots(self, spot_payloads: dict, tides: dict):
+        forecasts = [
+            self.build_forecast(waves_data, wind_data).with_columns(
+                pl.lit(id_spot).alias("spot_id")
+            )
+            for id_spot, (waves_data, wind_data) in spot_payloads.items()
         ]
-        forecast["wave_direction"] = ammend_wave_directions(
-            wave_directions, wave_direction_degrees
-        )
-        forecast["energy"] = generate_energy(wave_height, wave_period)
-
-        forecast["tide"] = generate_tides(tides, forecast["datetime"])
-        forecast["nearest_tide"] = generate_nearest_tides(tides, forecast["datetime"])
-        forecast["tide_percentage"] = generate_tide_percentages(
-            tides, forecast["datetime"]
+        with span("forecast.columns") as columns_span:
+            forecast = pl.concat(forecasts).collect()
+            columns_span.rows = forecast.height
+        return self.classify_forecast(forecast, tides)
+
+    def classify_forecast(self, forecast: pl.DataFrame, tides: dict):
+        with span("forecast.tides", rows=forecast.height):
+            tide_columns = generate_tide_columns(tides, forecast["datetime"])
+            forecast = forecast.with_columns(
+                [pl.Series(name, values) for name, values in tide_columns.items()]
+            ).with_columns(pl.col("tide_height").cast(pl.Float64))
+        with span("forecast.classify", rows=forecast.height):
+            return compact_forecast(classify_spots(forecast))
+
+    def build_forecast(self, waves_data: dict, wind_data: dict):
+        # The fcst arrays go straight into columns; gaps are forward filled
+        # and everything derived per hour is a column expression
+        wind_fcst = wind_data.get("fcst")
+        waves_fcst = waves_data.get("fcst")
+        arrays = {
+            "wind_speed": wind_fcst.get("WINDSPD"),
+            "wind_direction_degrees": wind_fcst.get("WINDDIR"),
+            "wave_height": waves_fcst.get("HTSGW"),
+            "wave_direction_degrees": waves_fcst.get("DIRPW"),
+            "wave_period": waves_fcst.get("PERPW"),
+            "hours": wind_fcst.get("hours"),
+        }
+        length = min(len(values) for values in arrays.values())
+        initstamp = int(wind_fcst.get("initstamp"))
+
+        measurements = [name for name in arrays if name != "hours"]
+        # Gaps are filled over the whole run before the display window drops
+        # the night hours; presentation strings are left to final_forecast_format
+        return (
+            pl.LazyFrame(
+                {
+                    name: pl.Series(name, values[:length], dtype=pl.Float64)
+                    for name, values in arrays.items()
+                }
+            )
+            .select(
+                [
+                    pl.col(name).ceil().forward_fill().fill_null(0).cast(pl.Int64)
+                    for name in measurements
+                ]
+                + [
+                    pl.from_epoch(
+                        pl.col("hours").cast(pl.Int64) * 3600 + initstamp,
+                        time_unit="s",
+                    ).alias("datetime")
+                ]
+            )
+            .filter(display_hours_expr(pl.col("datetime")))
+            .with_columns(
+                predominant_expr(pl.col("wind_direction_degrees")).alias(
+                    "wind_direction_predominant"
+                ),
+                compass_expr(pl.col("wind_direction_degrees")).alias("wind_direction"),
+                predominant_expr(pl.col("wave_direction_degrees")).alias(
+                    "wave_direction_predominant"
+                ),
+                wave_compass_expr(pl.col("wave_direction_degrees")).alias(
+                    "wave_direction"
+                ),
+                wave_energy_expr(pl.col("wave_height"), pl.col("wave_period")).alias(
+                    "energy"
+                ),
+            )
+            .select(FORECAST_COLUMNS)
         )
-        forecast["spot_name"] = generate_spot_names(forecast)
-        forecast["date_name"] = create_date_name_column(forecast["datetime"])
-
-        format_forecast = align_dict_columns(forecast)
-        return pl.DataFrame(format_forecast)
@@ -0,0 +1,238 @@
+import polars as pl
+
+NO_SPOT = "No Clasificado"
+
+WIND_DIRECTION_PREDOMINANT = pl.col("wind_direction_predominant")
+WIND_DIRECTION = pl.col("wind_direction")
+WAVE_DIRECTION_PREDOMINANT = pl.col("wave_direction_predominant")
+WAVE_DIRECTION = pl.col("wave_direction")
+WIND_SPEED = pl.col("wind_speed")
+WAVE_PERIOD = pl.col("wave_period")
+WAVE_ENERGY = pl.col("energy")
+TIDE_PERCENTAGE = pl.col("tide_percentage")
+
+
+# Expression counterparts of the *_conditions functions in utils.py, evaluated
+# over whole forecast columns instead of one hour at a time.
+def _is_in(expr: pl.Expr, directions: list) -> pl.Expr:
+    # A missing direction is never "in" a list, like `None in [...]`
+    return expr.is_in(directions).fill_null(False)
+
+
+def _any_in(predominant: pl.Expr, direction: pl.Expr, directions: list) -> pl.Expr:
+    return _is_in(predominant, directions) | _is_in(direction, directions)
+
+
+def _none_in(predominant: pl.Expr, direction: pl.Expr, directions: list) -> pl.Expr:
+    return ~_is_in(predominant, directions) & ~_is_in(direction, directions)
+
+
+def _contains(predominant: pl.Expr, direction: pl.Expr, letter: str) -> pl.Expr:
+    return (
+        predominant.cast(pl.Utf8).str.contains(letter, literal=True)
+        | direction.cast(pl.Utf8).str.contains(letter, literal=True)
+    ).fill_null(False)
+
+
+def favorable_wind(directions: list) -> pl.Expr:
+    return _any_in(WIND_DIRECTION_PREDOMINANT, WIND_DIRECTION, directions)
+
+
+def wave_from(directions: list) -> pl.Expr:
+    return _any_in(WAVE_DIRECTION_PREDOMINANT, WAVE_DIRECTION, directions)
+
+
+def famara_favorable_wind() -> pl.Expr:
+    return _none_in(WIND_DIRECTION_PREDOMINANT, WIND_DIRECTION, ["SW"]) & (
+        favorable_wind(["S"])
+    )
+
+
+def punta_mujeres_favorable_wind() -> pl.Expr:
+    return ~_contains(WIND_DIRECTION_PREDOMINANT, WIND_DIRECTION, "E") & (
+        favorable_wind(["N", "NW"])
+    )
+
+
+def san_juan_favorable_wind() -> pl.Expr:
+    return ~_contains(WIND_DIRECTION_PREDOMINANT, WIND_DIRECTION, "N") & (
+        favorable_wind(["S", "SE", "W", "SW"])
+    )
+
+
+def punta_mujeres_low_wind_conditions() -> pl.Expr:
+    return (
+        wave_from(["N", "NE", "E", "NNW", "NNE", "NW"])
+        & (WAVE_ENERGY >= 1000)
+        & _none_in(WAVE_DIRECTION_PREDOMINANT, WAVE_DIRECTION, ["WNW", "W"])
+    )
+
+
+def el_espino_conditions() -> pl.Expr:
+    return (
+        (TIDE_PERCENTAGE > 80)
+        & punta_mujeres_favorable_wind()
+        & punta_mujeres_low_wind_conditions()
+    )
+
+
+def el_cartel_conditions() -> pl.Expr:
+    return (
+        (TIDE_PERCENTAGE <= 80)
+        & punta_mujeres_favorable_wind()
+        & punta_mujeres_low_wind_conditions()
+    )
+
+
+def papagayo_conditions() -> pl.Expr:
+    return (
+        favorable_wind(["E", "NE"])
+        & wave_from(["W", "WNW"])
+        & (WAVE_ENERGY >= 1200)
+        & (TIDE_PERCENTAGE <= 50)
+    )
+
+
+def tiburon_low_wind_conditions() -> pl.Expr:
+    return wave_from(["W", "WNW"]) & (WAVE_ENERGY >= 5000)
+
+
+def tiburon_conditions() -> pl.Expr:
+    return favorable_wind(["NW", "N"]) & tiburon_low_wind_conditions()
+
+
+def posible_tiburon_conditions() -> pl.Expr:
+    return favorable_wind(["NE"]) & tiburon_low_wind_conditions()
+
+
+def bajorisco_conditions() -> pl.Expr:
+    return (
+        favorable_wind(["S"])
+        & wave_from(["W", "WNW"])
+        & (WAVE_ENERGY >= 900)
+        & (TIDE_PERCENTAGE > 50)
+    )
+
+
+def papelillo_conditions() -> pl.Expr:
+    return (
+        wave_from(["N", "NW", "NE"])
+        & (WAVE_ENERGY >= 100)
+        & favorable_wind(["E", "SE"])
+    )
+
+
+def north_swell_medium_energy_conditions() -> pl.Expr:
+    # Shared by caleta_caballo, lasanta and famara low wind conditions
+    return (
+        wave_from(["N", "NW", "NE"])
+        & ~_is_in(WAVE_DIRECTION, ["WNW"])
+        & (WAVE_ENERGY >= 100)
+        & (WAVE_ENERGY <= 1000)
+    )
+
+
+def caleta_caballo_conditions() -> pl.Expr:
+    return favorable_wind(["W", "SW", "WNW"]) & north_swell_medium_energy_conditions()
+
+
+def lasanta_conditions() -> pl.Expr:
+    return favorable_wind(["E", "NE", "SE"]) & north_swell_medium_energy_conditions()
+
+
+def famara_conditions() -> pl.Expr:
+    return famara_favorable_wind() & north_swell_medium_energy_conditions()
+
+
+def san_juan_conditions() -> pl.Expr:
+    return (
+        san_juan_favorable_wind()
+        & wave_from(["N", "NW", "NE"])
+        & ~_is_in(WAVE_DIRECTION, ["WNW"])
+        & (WAVE_ENERGY > 1000)
+    )
+
+
+def bastian_conditions() -> pl.Expr:
+    return (
+        favorable_wind(["NE", "N"])
+        & wave_from(["N", "NW", "NE", "E", "S"])
+        & _none_in(WAVE_DIRECTION_PREDOMINANT, WAVE_DIRECTION, ["WNW"])
+        & (WIND_SPEED >= 19.0)
+        & (TIDE_PERCENTAGE >= 50)
+    )
+
+
+def barcarola_conditions() -> pl.Expr:
+    return (
+        favorable_wind(["NE", "N"])
+        & wave_from(["N", "NW", "NE", "E", "S"])
+        & ~_is_in(WAVE_DIRECTION, ["WNW"])
+        & (WIND_SPEED >= 20.0)
+        & (WAVE_PERIOD >= 10)
+        & (TIDE_PERCENTAGE <= 50)
+    )
+
+
+# Same priority order as utils.get_low_wind_spot
+LOW_WIND_RULES = [
+    (famara_conditions, "Famara"),
+    (tiburon_conditions, "Tiburón-Espino"),
+    (posible_tiburon_conditions, "Posible Tiburón"),
+    (papagayo_conditions, "Papagayo - Montaña Amarilla"),
+    (bajorisco_conditions, "Papelillo - Bajo el Risco"),
+    (papelillo_conditions, "Papelillo"),
+    (lasanta_conditions, "La Santa"),
+    (san_juan_conditions, "San Juan - Cagao - El Muelle"),
+    (el_espino_conditions, "El Espino"),
+    (el_cartel_conditions, "El Cartel"),
+    (caleta_caballo_conditions, "Caleta Caballo"),
+]
+
+# Same priority order as utils.generate_spot_name
+WIND_RULES = [
+    (el_espino_conditions, "El Espino"),
+    (el_cartel_conditions, "El Cartel"),
+    (barcarola_conditions, "Barcarola"),
+    (bastian_conditions, "Bastián"),
+    (tiburon_conditions, "Tiburón-Espino"),
+    (posible_tiburon_conditions, "Posible Tiburón"),
+    (papagayo_conditions, "Papagayo - Montaña Amarilla"),
+    (bajorisco_conditions, "Bajo el Risco"),
+    (papelillo_conditions, "Papelillo"),
+    (caleta_caballo_conditions, "Caleta Caballo"),
+    (famara_conditions, "Famara"),
+    (lasanta_conditions, "La Santa"),
+    (san_juan_conditions, "San Juan - Cagao - El Muelle"),
+]
+
+SPOT_NAMES = list(
+    dict.fromkeys(
+        [spot for _, spot in LOW_WIND_RULES + WIND_RULES] + [NO_SPOT],
+    )
+)
+
+
+def _cascade(rules: list) -> pl.Expr:
+    condition, spot = rules[0]
+    expr = pl.when(condition()).then(pl.lit(spot))
+    for condition, spot in rules[1:]:
+        expr = expr.when(condition()).then(pl.lit(spot))
+    return expr.otherwise(pl.lit(NO_SPOT))
+
+
+def is_low_wind() -> pl.Expr:
+    return WIND_SPEED < 10.0
+
+
+def spot_name_expr() -> pl.Expr:
+    return (
+        pl.when(is_low_wind())
+        .then(_cascade(LOW_WIND_RULES))
+        .otherwise(_cascade(WIND_RULES))
+        .alias("spot_name")
+    )
+
+
+def classify_spots(df: pl.DataFrame) -> pl.DataFrame:
+    return df.with_columns(spot_name_expr())
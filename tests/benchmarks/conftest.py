@@ -0,0 +1,113 @@
+import copy
+import json
+import locale
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from utils import (
+    create_direction_predominant_column,
+    directions_from_degrees,
+    generate_energy,
+    wave_directions_from_degrees,
+)
+
+SAMPLES_DIR = Path(__file__).parent.parent.parent / "samples"
+FORECAST_HOURS = [240, 384, 10_000]
+TIDE_TABLE_DAYS = [3, 16, 60]
+TIDE_INTERVAL_SECONDS = 6 * 3600 + 12 * 60 + 30
+
+
+def load_sample(name: str) -> dict:
+    return json.loads((SAMPLES_DIR / name).read_text(encoding="utf-8"))
+
+
+def replay(payload: dict, hours: int, initstamp: int) -> dict:
+    # The sample run is tiled up to the requested length and moved to the
+    # current hour, so final_forecast_format keeps its future rows
+    payload = copy.deepcopy(payload)
+    fcst = payload["fcst"]
+    for name, values in fcst.items():
+        if isinstance(values, list) and name != "hours":
+            fcst[name] = [values[i % len(values)] for i in range(hours)]
+    fcst["hours"] = list(range(hours))
+    fcst["initstamp"] = initstamp
+    return payload
+
+
+def current_initstamp() -> int:
+    return int(time.time()) // 3600 * 3600
+
+
+def synthetic_tides(days: int, start: float) -> list:
+    tides = []
+    for i in range(int(days * 86400 / TIDE_INTERVAL_SECONDS)):
+        timestamp = start + i * TIDE_INTERVAL_SECONDS
+        high = i % 2 == 0
+        tides.append(
+            {
+                "tide": "pleamar" if high else "bajamar",
+                "timestamp": timestamp,
+                "height": 2.6 if high else 0.4,
+                "datetime": datetime.fromtimestamp(timestamp).isoformat(),
+            }
+        )
+    return tides
+
+
+@pytest.fixture(scope="session")
+def sample_payloads():
+    return load_sample("iapi_famara_waves.json"), load_sample("iapi_famara_wind.json")
+
+
+@pytest.fixture(scope="session", params=FORECAST_HOURS, ids=lambda hours: f"{hours}h")
+def payloads(request, sample_payloads):
+    initstamp = current_initstamp()
+    waves_data, wind_data = sample_payloads
+    return (
+        replay(waves_data, request.param, initstamp),
+        replay(wind_data, request.param, initstamp),
+    )
+
+
+@pytest.fixture(scope="session", params=TIDE_TABLE_DAYS, ids=lambda days: f"{days}d")
+def tides(request):
+    return synthetic_tides(request.param, current_initstamp() - 86400)
+
+
+@pytest.fixture(scope="session")
+def forecast_columns(payloads):
+    # The per-hour lists the helpers in utils take, straight from the payloads
+    waves_fcst, wind_fcst = payloads[0]["fcst"], payloads[1]["fcst"]
+    start = datetime.fromtimestamp(wind_fcst["initstamp"])
+    wind_degrees = np.array([degree or 0 for degree in wind_fcst["WINDDIR"]])
+    wave_degrees = np.array([degree or 0 for degree in waves_fcst["DIRPW"]])
+    wave_heights = [height or 0 for height in waves_fcst["HTSGW"]]
+    wave_periods = [period or 0 for period in waves_fcst["PERPW"]]
+    hours = len(wind_fcst["hours"])
+    return {
+        "datetime": [start + timedelta(hours=hour) for hour in wind_fcst["hours"]],
+        "wind_direction_degrees": wind_degrees.tolist(),
+        "wave_height": wave_heights,
+        "wave_period": wave_periods,
+        "wind_direction_predominant": create_direction_predominant_column(wind_degrees),
+        "wave_direction_predominant": create_direction_predominant_column(wave_degrees),
+        "wind_direction": directions_from_degrees(wind_degrees).tolist(),
+        "wave_direction": wave_directions_from_degrees(wave_degrees).tolist(),
+        "wind_speed": [speed or 0 for speed in wind_fcst["WINDSPD"]],
+        "tide_percentage": (np.arange(hours) * 7 % 101).tolist(),
+        "energy": generate_energy(wave_heights, wave_periods),
+    }
+
+
+@pytest.fixture(scope="session")
+def windguru():
+    # The scraper pins the es_ES.UTF-8 locale at import time
+    try:
+        from scrapers.windguru import Windguru
+    except locale.Error:
+        pytest.skip("scrapers.windguru needs the es_ES.UTF-8 locale")
+    return Windguru(client=object())
@@ -0,0 +1,57 @@
+import pytest
+
+from tide_index import generate_tide_columns
+from utils import (
+    create_direction_predominant_column,
+    final_forecast_format,
+    generate_energy,
+    generate_spot_names,
+)
+
+
+@pytest.mark.benchmark(group="spot_names")
+def test_generate_spot_names(benchmark, forecast_columns):
+    spot_names = benchmark(generate_spot_names, forecast_columns)
+    assert len(spot_names) == len(forecast_columns["datetime"])
+
+
+@pytest.mark.benchmark(group="energy")
+def test_generate_energy(benchmark, forecast_columns):
+    energy = benchmark(
+        generate_energy,
+        forecast_columns["wave_height"],
+        forecast_columns["wave_period"],
+    )
+    assert energy == forecast_columns["energy"]
+
+
+@pytest.mark.benchmark(group="directions")
+def test_create_direction_predominant_column(benchmark, forecast_columns):
+    predominant = benchmark(
+        create_direction_predominant_column,
+        forecast_columns["wind_direction_degrees"],
+    )
+    assert predominant == forecast_columns["wind_direction_predominant"]
+
+
+@pytest.mark.benchmark(group="tides")
+def test_generate_tide_columns(benchmark, tides, forecast_columns):
+    # generate_tides, generate_nearest_tides and generate_tide_percentages all
+    # build every column through this call
+    datetimes = forecast_columns["datetime"]
+    columns = benchmark(generate_tide_columns, tides, datetimes)
+    assert all(len(values) == len(datetimes) for values in columns.values())
+
+
+@pytest.mark.benchmark(group="scrape_with_request")
+def test_scrape_with_request(benchmark, windguru, payloads, tides):
+    waves_data, wind_data = payloads
+    forecast = benchmark(windguru.scrape_with_request, waves_data, wind_data, tides)
+    assert not forecast.is_empty()
+
+
+@pytest.mark.benchmark(group="final_forecast_format")
+def test_final_forecast_format(benchmark, windguru, payloads, tides):
+    waves_data, wind_data = payloads
+    forecast = windguru.scrape_spots({"49328": (waves_data, wind_data)}, tides)
+    assert not benchmark(final_forecast_format, forecast).is_empty()
@@ -0,0 +1,25 @@
+from pathlib import Path
+
+import pytest
+
+from scrapers.tides import parse_tides_bs4, parse_tides_lxml
+
+SAMPLE_PAGE = (
+    Path(__file__).parent.parent.parent / "samples" / "arrecife_tablademareas.html"
+)
+
+
+@pytest.fixture(scope="module")
+def page():
+    return SAMPLE_PAGE.read_text(encoding="utf-8")
+
+
+@pytest.mark.benchmark(group="tide_parser")
+def test_parse_tides_bs4(benchmark, page):
+    assert benchmark(parse_tides_bs4, page)
+
+
+@pytest.mark.benchmark(group="tide_parser")
+def test_parse_tides_lxml(benchmark, page):
+    pytest.importorskip("lxml")
+    assert benchmark(parse_tides_lxml, page)
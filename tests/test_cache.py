@@ -0,0 +1,131 @@
+import os
+import threading
+import time
+from datetime import date, datetime, timedelta, timezone
+
+import polars as pl
+
+from front.one import cache
+
+RUN_00Z = datetime(2025, 3, 1, 0, tzinfo=timezone.utc)
+RUN_12Z = RUN_00Z + timedelta(hours=12)
+
+
+def payload(model_run_time: datetime) -> dict:
+    return {"fcst": {"initstamp": int(model_run_time.timestamp()), "hours": [0]}}
+
+
+def test_model_cache_is_keyed_by_run(tmp_path, monkeypatch):
+    monkeypatch.setattr(
+        cache, "MODEL_CACHE_PATH", str(tmp_path / "{id_model}_{id_spot}_{run}.json")
+    )
+    cache.save_model_cache("3", "49328", RUN_00Z, payload(RUN_00Z))
+
+    much_later = time.time() + 24 * 3600
+    assert cache.load_model_cache("3", "49328", RUN_00Z, now=much_later) == payload(
+        RUN_00Z
+    )
+    assert cache.load_model_cache("3", "49328", RUN_12Z) is None
+    assert cache.load_model_cache("84", "49328", RUN_00Z) is None
+
+    cache.save_model_cache("3", "49328", RUN_12Z, payload(RUN_12Z))
+    assert len(cache.list_model_caches("3", "49328")) == 1
+    assert cache.load_latest_model_cache("3", "49328") == payload(RUN_12Z)
+
+
+def test_late_run_is_retried(tmp_path, monkeypatch):
+    monkeypatch.setattr(
+        cache, "MODEL_CACHE_PATH", str(tmp_path / "{id_model}_{id_spot}_{run}.json")
+    )
+    # Upstream still answers with the 00Z run after 12Z
+    cache.save_model_cache("3", "49328", RUN_12Z, payload(RUN_00Z))
+
+    assert cache.load_model_cache("3", "49328", RUN_12Z) == payload(RUN_00Z)
+    retry_at = time.time() + cache.LATE_RUN_RETRY_SECONDS + 1
+    assert cache.load_model_cache("3", "49328", RUN_12Z, now=retry_at) is None
+
+
+def test_corrupted_cache_reads_as_missing(tmp_path):
+    filepath = str(tmp_path / "tides.json")
+    with open(filepath, "w") as f:
+        f.write('{"timestamp": 1, "payl')
+
+    assert cache.load_cache(filepath) is None
+
+    cache.save_cache(filepath, [{"tide": "pleamar"}])
+    assert cache.load_cache(filepath) == [{"tide": "pleamar"}]
+    assert sorted(os.listdir(tmp_path)) == ["tides.json"]
+
+
+def test_single_flight_refreshes_once(tmp_path):
+    filepath = str(tmp_path / "tides.json")
+    refreshes = []
+
+    def refresh():
+        refreshes.append(threading.get_ident())
+        time.sleep(0.2)
+        cache.save_cache(filepath, "fresh")
+        return "fresh"
+
+    def load():
+        results.append(
+            cache.single_flight(
+                filepath, load_fresh=lambda: cache.load_cache(filepath), refresh=refresh
+            )
+        )
+
+    results = []
+    threads = [threading.Thread(target=load) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(refreshes) == 1
+    assert results == ["fresh"] * 8
+
+
+def test_single_flight_serves_stale_while_refreshing(tmp_path):
+    filepath = str(tmp_path / "tides.json")
+    lock = cache.FileLock(filepath)
+    assert lock.acquire(timeout=0)
+    try:
+        result = cache.single_flight(
+            filepath,
+            load_fresh=lambda: None,
+            refresh=lambda: "fresh",
+            load_stale=lambda: "stale",
+        )
+    finally:
+        lock.release()
+
+    assert result == "stale"
+
+
+def test_frame_cache_round_trip(tmp_path, monkeypatch):
+    monkeypatch.setattr(
+        cache, "FRAME_CACHE_PATH", str(tmp_path / "forecast_{key}.arrow")
+    )
+    spot_payloads = {"49328": (payload(RUN_00Z), payload(RUN_00Z))}
+    tides = [{"tide": "pleamar", "timestamp": 0.0}]
+    key = cache.frame_cache_key(spot_payloads, tides)
+    df = pl.DataFrame(
+        {
+            "datetime": [datetime(2025, 3, 1, 6)],
+            "date": [date(2025, 3, 1)],
+            "spot_name": ["Famara"],
+        }
+    )
+
+    assert cache.load_frame_cache(key) is None
+    cache.save_frame_cache(key, df)
+    assert cache.load_frame_cache(key).equals(df)
+
+    other_payloads = {"49328": (payload(RUN_12Z), payload(RUN_00Z))}
+    assert cache.frame_cache_key(other_payloads, tides) != key
+    # Equal payloads fetched again, on any day, hit the cached frame
+    same_payloads = {"49328": (payload(RUN_00Z), payload(RUN_00Z))}
+    assert cache.frame_cache_key(same_payloads, list(tides)) == key
+
+    cache.save_frame_cache("other", df)
+    assert os.listdir(tmp_path) == ["forecast_other.arrow"]
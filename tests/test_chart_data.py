@@ -0,0 +1,47 @@
+from datetime import datetime, timedelta
+
+import numpy as np
+import polars as pl
+
+from front.one.chart_data import downsample_energy, lttb_indices
+
+
+def test_lttb_keeps_edges_and_peaks():
+    x = np.arange(1000)
+    y = np.sin(x / 50.0)
+    y[500] = 10
+
+    indices = lttb_indices(x, y, 100)
+
+    assert len(indices) == 100
+    assert indices[0] == 0 and indices[-1] == 999
+    assert 500 in indices
+    assert np.all(np.diff(indices) > 0)
+    assert len(lttb_indices(x[:50], y[:50], 100)) == 50
+
+
+def test_downsample_energy_splits_the_budget_per_spot():
+    start = datetime(2025, 3, 1)
+    rows = 400
+    data = pl.DataFrame(
+        {
+            "datetime": [start + timedelta(hours=i) for i in range(rows)] * 2,
+            "spot_name": ["Famara"] * rows + ["La Santa"] * rows,
+            "energy": list(range(rows)) * 2,
+            "wave_height": [1.0] * rows * 2,
+            "wave_period": [10.0] * rows * 2,
+            "wind_speed": [5.0] * rows * 2,
+        }
+    )
+
+    chart_data = downsample_energy(data, point_budget=200)
+
+    assert chart_data.columns == [
+        "datetime",
+        "spot_name",
+        "energy",
+        "wave_height",
+        "wave_period",
+    ]
+    assert chart_data.group_by("spot_name").len()["len"].to_list() == [100, 100]
+    assert chart_data["datetime"].min() == start
@@ -0,0 +1,44 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from scrapers.client import HttpClient
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        self.server.client_ports.add(self.client_address[1])
+        body = json.dumps({"fcst": {"path": self.path}}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_stub_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+    server.client_ports = set()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def test_http_client_reuses_connections():
+    server = start_stub_server()
+    url = f"http://127.0.0.1:{server.server_address[1]}/int/iapi.php"
+    client = HttpClient(pool_size=2)
+    try:
+        for id_spot in range(5):
+            response = client.get(url, params={"id_spot": id_spot}, timeout=5)
+            assert response.json()["fcst"]["path"].endswith(f"id_spot={id_spot}")
+    finally:
+        client.close()
+        server.shutdown()
+        server.server_close()
+
+    assert len(server.client_ports) == 1
@@ -0,0 +1,62 @@
+import numpy as np
+import polars as pl
+
+from utils import (
+    ammend_wave_directions,
+    compass_expr,
+    degrees_to_direction,
+    directions_from_degrees,
+    get_predominant_direction,
+    predominant_expr,
+    predominant_from_degrees,
+    wave_compass_expr,
+    wave_directions_from_degrees,
+)
+
+
+def test_lookup_tables_match_the_scalar_conversions():
+    degrees = np.arange(-720, 1081)
+
+    assert directions_from_degrees(degrees).tolist() == [
+        degrees_to_direction(int(degree)) for degree in degrees
+    ]
+    assert predominant_from_degrees(degrees).tolist() == [
+        get_predominant_direction(int(degree)) for degree in degrees
+    ]
+    for degree in [0, 90, 180, 270, 360]:
+        assert predominant_from_degrees([degree])[0] == get_predominant_direction(
+            degree
+        )
+
+
+def test_fractional_degrees_and_wnw_override():
+    degrees = np.random.default_rng(0).uniform(-360, 720, 2000)
+    degrees = np.concatenate([degrees, [11.25, 33.75, 348.75, 359.99, 0.5]])
+
+    assert directions_from_degrees(degrees).tolist() == [
+        degrees_to_direction(degree) for degree in degrees
+    ]
+    assert predominant_from_degrees(degrees).tolist() == [
+        get_predominant_direction(int(degree)) for degree in degrees
+    ]
+
+    whole = list(range(361))
+    expected = ammend_wave_directions(
+        [degrees_to_direction(degree) for degree in whole], whole
+    )
+    assert wave_directions_from_degrees(whole).tolist() == expected
+
+
+def test_column_expressions_match_the_lookup_tables():
+    degrees = np.arange(-360, 721)
+    df = pl.DataFrame({"degrees": degrees}).select(
+        compass_expr(pl.col("degrees")).alias("direction"),
+        predominant_expr(pl.col("degrees")).alias("predominant"),
+        wave_compass_expr(pl.col("degrees")).alias("wave_direction"),
+    )
+
+    assert df["direction"].to_list() == directions_from_degrees(degrees).tolist()
+    assert df["predominant"].to_list() == predominant_from_degrees(degrees).tolist()
+    assert (
+        df["wave_direction"].to_list() == wave_directions_from_degrees(degrees).tolist()
+    )
@@ -0,0 +1,34 @@
+from datetime import datetime, timedelta
+
+import polars as pl
+
+from utils import (
+    create_date_name_column,
+    datetime_to_frontend_str,
+    display_columns,
+    display_hours_expr,
+)
+
+
+def test_display_window_and_columns():
+    start = datetime.now().replace(minute=0, second=0, microsecond=0)
+    datetimes = [start + timedelta(hours=hour) for hour in range(72)]
+    df = (
+        pl.LazyFrame({"datetime": datetimes})
+        .filter(display_hours_expr(pl.col("datetime")))
+        .with_columns(display_columns())
+        .collect()
+    )
+
+    shown = [moment for moment in datetimes if 6 <= moment.hour <= 19]
+    assert df["datetime"].to_list() == shown
+    assert df["date_friendly"].to_list() == [
+        datetime_to_frontend_str(moment) for moment in shown
+    ]
+    assert df["date_name"].to_list() == create_date_name_column(shown)
+    assert df["time_friendly"].to_list() == [
+        moment.strftime("%H:%M") for moment in shown
+    ]
+    assert df["time_graph"].to_list() == [
+        moment.strftime("%H\\:%M") for moment in shown
+    ]
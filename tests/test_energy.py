@@ -0,0 +1,37 @@
+import random
+
+import numpy as np
+
+from utils import calculate_energy, generate_energy, wave_energy
+
+
+def test_wave_energy_matches_the_scalar_reference():
+    rng = random.Random(21)
+    for _ in range(200):
+        size = rng.randint(1, 50)
+        if rng.random() < 0.5:
+            heights = [rng.randint(0, 12) for _ in range(size)]
+            periods = [rng.randint(0, 25) for _ in range(size)]
+        else:
+            heights = [rng.uniform(0, 12) for _ in range(size)]
+            periods = [rng.uniform(0, 25) for _ in range(size)]
+
+        expected = [calculate_energy(h, t) for h, t in zip(heights, periods)]
+
+        assert wave_energy(heights, periods).tolist() == expected
+        assert generate_energy(heights, periods) == expected
+
+
+def test_exact_pi_and_finite_depth():
+    heights = np.array([2.0, 2.0, 2.0, 0.0])
+    periods = np.array([12.0, 12.0, 0.0, 12.0])
+
+    approximate = wave_energy(heights, periods)
+    exact = wave_energy(heights, periods, exact_pi=True)
+    deep = wave_energy(heights, periods, exact_pi=True, depth=1000)
+    shallow = wave_energy(heights, periods, exact_pi=True, depth=5)
+
+    assert exact[0] <= approximate[0]
+    assert deep.tolist() == exact.tolist()
+    assert shallow[0] < exact[0] / 2
+    assert shallow[2:].tolist() == [0, 0]
@@ -0,0 +1,91 @@
+import threading
+import time
+
+import pytest
+
+from front.one.fetch import (
+    FETCH_BUDGET_SECONDS,
+    FETCH_TOTAL_BUDGET_SECONDS,
+    fetch_sources,
+)
+
+BUDGETS = {"waves": 0.3, "wind": 0.3, "tides": 0.5}
+
+
+def test_failed_and_late_sources_fall_back_within_their_budget():
+    release = threading.Event()
+
+    def failing(budget):
+        raise ConnectionError("upstream down")
+
+    def hanging(budget):
+        release.wait(5)
+        return {"fcst": "fresh"}
+
+    sources = {
+        ("waves", "49328"): (failing, lambda: {"fcst": "stale waves"}),
+        ("wind", "49328"): (hanging, lambda: {"fcst": "stale wind"}),
+        ("tides", None): (lambda budget: ["fresh tides"], lambda: ["stale tides"]),
+    }
+    started = time.monotonic()
+    try:
+        results = fetch_sources(sources, 3, BUDGETS, total_budget=2)
+    finally:
+        release.set()
+    elapsed = time.monotonic() - started
+
+    assert results == {
+        ("waves", "49328"): {"fcst": "stale waves"},
+        ("wind", "49328"): {"fcst": "stale wind"},
+        ("tides", None): ["fresh tides"],
+    }
+    assert BUDGETS["wind"] <= elapsed < BUDGETS["wind"] + 0.5
+
+
+def test_queued_sources_are_capped_by_the_total_budget():
+    release = threading.Event()
+
+    def hanging(budget):
+        release.wait(5)
+        return "fresh"
+
+    # One worker: the second source never starts while the first one hangs
+    sources = {
+        ("wind", spot): (hanging, lambda spot=spot: f"stale {spot}")
+        for spot in ["1", "2"]
+    }
+    started = time.monotonic()
+    try:
+        results = fetch_sources(sources, 1, {"wind": 10}, total_budget=0.4)
+    finally:
+        release.set()
+
+    assert results == {("wind", "1"): "stale 1", ("wind", "2"): "stale 2"}
+    assert time.monotonic() - started < 0.9
+
+
+def test_each_fetch_gets_the_budget_it_has_left():
+    budgets = {}
+
+    def fetch(key):
+        def run(budget):
+            budgets[key] = budget
+            return "fresh"
+
+        return run
+
+    sources = {
+        (kind, "49328"): (fetch(kind), lambda: "stale") for kind in ["waves", "tides"]
+    }
+    fetch_sources(sources, 2, BUDGETS, total_budget=0.4)
+
+    # The tides budget is what the total leaves once the fetch starts
+    assert budgets == {
+        "waves": pytest.approx(BUDGETS["waves"], abs=0.05),
+        "tides": pytest.approx(0.4, abs=0.05),
+    }
+
+
+def test_every_source_has_a_budget_within_the_total():
+    assert set(FETCH_BUDGET_SECONDS) == {"waves", "wind", "tides"}
+    assert max(FETCH_BUDGET_SECONDS.values()) <= FETCH_TOTAL_BUDGET_SECONDS
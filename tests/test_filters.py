@@ -0,0 +1,69 @@
+import random
+from datetime import date, timedelta
+
+import polars as pl
+
+from front.one.filters import ForecastFilter
+
+
+def build_forecast(rows: int = 300) -> pl.DataFrame:
+    rng = random.Random(7)
+    start = date(2025, 3, 1)
+    return pl.DataFrame(
+        {
+            "date": [start + timedelta(days=rng.randint(0, 9)) for _ in range(rows)],
+            "date_name": [
+                rng.choice(["Hoy", "Mañana", "Otro día"]) for _ in range(rows)
+            ],
+            "spot_name": [
+                rng.choice(["Famara", "La Santa", None]) for _ in range(rows)
+            ],
+            "wind_speed": [rng.choice([None, rng.uniform(0, 30)]) for _ in range(rows)],
+            "energy": [rng.randint(0, 3000) for _ in range(rows)],
+        }
+    )
+
+
+def test_filter_matches_the_boolean_mask():
+    df = build_forecast()
+    forecast_filter = ForecastFilter(df)
+    rng = random.Random(3)
+
+    for _ in range(50):
+        dates = rng.sample(forecast_filter.categories["date"], 4)
+        date_names = rng.sample(["Hoy", "Mañana", "Otro día"], 2)
+        beaches = rng.sample(["Famara", "La Santa"], rng.randint(1, 2))
+        wind = sorted(rng.uniform(0, 30) for _ in range(2))
+        energy = sorted(rng.randint(0, 3000) for _ in range(2))
+        mask = (
+            df["date"].is_in(dates)
+            & df["date_name"].is_in(date_names)
+            & df["spot_name"].is_in(beaches)
+            & (df["wind_speed"] >= wind[0])
+            & (df["wind_speed"] <= wind[1])
+            & (df["energy"] >= energy[0])
+            & (df["energy"] <= energy[1])
+        )
+
+        result = forecast_filter.filter(dates, date_names, beaches, wind, energy)
+
+        assert result.equals(df.filter(mask))
+
+
+def test_filter_states_are_memoized():
+    df = build_forecast()
+    forecast_filter = ForecastFilter(df, cache_entries=2)
+    dates = forecast_filter.categories["date"]
+
+    first = forecast_filter.filter(dates, ["Hoy"], ["Famara"], (0, 30), (0, 3000))
+    again = forecast_filter.filter(
+        list(reversed(dates)), ["Hoy"], ["Famara"], (0.0, 30.0), (0, 3000)
+    )
+    assert again is first
+
+    forecast_filter.filter(dates, ["Mañana"], ["Famara"], (0, 30), (0, 3000))
+    forecast_filter.filter(dates, ["Otro día"], ["Famara"], (0, 30), (0, 3000))
+    assert (
+        forecast_filter.filter(dates, ["Hoy"], ["Famara"], (0, 30), (0, 3000))
+        is not first
+    )
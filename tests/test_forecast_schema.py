@@ -0,0 +1,32 @@
+import polars as pl
+
+from forecast_schema import COMPASS, compact_forecast
+from utils import degrees_to_direction
+
+
+def test_compact_forecast_uses_fixed_vocabularies():
+    df = pl.DataFrame(
+        {
+            "wind_speed": [12, 30],
+            "energy": [1500, 80000],
+            "wind_direction": ["WNW", "N"],
+            "wind_direction_predominant": ["NW", None],
+            "spot_name": ["Famara", "No Clasificado"],
+            "nearest_tide": ["Llena", "Sin datos"],
+            "date_name": ["Hoy", "Otro día"],
+            "date_friendly": ["Lunes, 03 de marzo de 2025"] * 2,
+        }
+    )
+
+    compact = compact_forecast(df)
+
+    assert compact.schema["wind_speed"] == pl.Int16
+    assert compact.schema["energy"] == pl.Int32
+    assert compact.schema["wind_direction"] == COMPASS
+    assert compact.schema["date_friendly"] == pl.Categorical
+    assert compact.filter(pl.col("wind_direction").is_in(["W", "WNW"])).height == 1
+    assert (
+        compact.with_columns(pl.all().cast(pl.Utf8)).rows()
+        == df.with_columns(pl.all().cast(pl.Utf8)).rows()
+    )
+    assert set(COMPASS.categories) == {degrees_to_direction(d) for d in range(360)}
@@ -0,0 +1,118 @@
+import json
+import locale
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import polars as pl
+import pytest
+
+from front.one import cache
+from front.one.chart_data import downsample_energy
+from urls.windguru import get_spot_ids
+from utils import spot_label_expr
+
+SAMPLES_DIR = Path(__file__).parent.parent / "samples"
+RUN_00Z = datetime(2025, 3, 1, 0, tzinfo=timezone.utc)
+
+
+@pytest.fixture
+def windguru_module():
+    # The scraper pins the es_ES.UTF-8 locale at import time
+    try:
+        from scrapers import windguru
+    except locale.Error:
+        pytest.skip("scrapers.windguru needs the es_ES.UTF-8 locale")
+    return windguru
+
+
+def sample_payloads() -> tuple:
+    initstamp = int(time.time()) // 3600 * 3600
+    payloads = []
+    for name in ["waves", "wind"]:
+        payload = json.loads((SAMPLES_DIR / f"iapi_famara_{name}.json").read_text())
+        payload["fcst"]["initstamp"] = initstamp
+        payloads.append(payload)
+    return tuple(payloads)
+
+
+def test_get_spot_ids():
+    urls = ["https://www.windguru.cz/49328", "https://www.windguru.cz/501281/"]
+    assert get_spot_ids(urls) == ["49328", "501281"]
+
+
+def test_model_cache_is_per_spot(tmp_path, monkeypatch):
+    monkeypatch.setattr(
+        cache, "MODEL_CACHE_PATH", str(tmp_path / "{id_model}_{id_spot}_{run}.json")
+    )
+    for id_spot in ["4932", "49328"]:
+        cache.save_model_cache("3", id_spot, RUN_00Z, {"fcst": {"id": id_spot}})
+
+    assert cache.model_cache_path("3", "4932", RUN_00Z) != cache.model_cache_path(
+        "3", "49328", RUN_00Z
+    )
+    assert cache.load_latest_model_cache("3", "4932") == {"fcst": {"id": "4932"}}
+    assert cache.load_latest_model_cache("3", "49328") == {"fcst": {"id": "49328"}}
+
+
+def test_spot_label_tells_forecast_points_apart():
+    single = pl.DataFrame({"spot_name": ["Famara"], "spot_id": ["49328"]})
+    assert single.select(spot_label_expr(single))["spot_name"].to_list() == ["Famara"]
+
+    both = pl.DataFrame(
+        {"spot_name": ["Famara", "Famara"], "spot_id": ["49328", "501281"]}
+    )
+    labels = both.select(spot_label_expr(both).alias("spot_label"))["spot_label"]
+    assert labels.to_list() == ["Famara (Famara)", "Famara (La Santa)"]
+
+
+def test_energy_chart_keeps_one_series_per_forecast_point():
+    start = datetime(2025, 3, 1)
+    data = pl.DataFrame(
+        {
+            "datetime": [start + timedelta(hours=i) for i in range(100)] * 2,
+            "spot_name": ["Famara"] * 200,
+            "spot_label": ["Famara (Famara)"] * 100 + ["Famara (La Santa)"] * 100,
+            "energy": list(range(200)),
+        }
+    )
+    downsampled = downsample_energy(data, point_budget=100)
+
+    for label in ["Famara (Famara)", "Famara (La Santa)"]:
+        series = downsampled.filter(pl.col("spot_label") == label)
+        assert series.height == 50
+        assert series["datetime"].is_unique().all()
+
+
+def test_scrape_spots_concatenates_every_spot(windguru_module):
+    waves_data, wind_data = sample_payloads()
+    windguru = windguru_module.Windguru(client=object())
+    single = windguru.scrape_with_request(waves_data, wind_data, [])
+    both = windguru.scrape_spots(
+        {"49328": (waves_data, wind_data), "501281": (waves_data, wind_data)}, []
+    )
+
+    assert both.height == 2 * single.height
+    assert both["spot_id"].unique().sort().to_list() == ["49328", "501281"]
+
+
+def test_day_tables_are_split_per_forecast_point(windguru_module):
+    from front.one.table import prepare_day_tables
+    from utils import final_forecast_format
+
+    waves_data, wind_data = sample_payloads()
+    forecast = final_forecast_format(
+        windguru_module.Windguru(client=object()).scrape_spots(
+            {"49328": (waves_data, wind_data), "501281": (waves_data, wind_data)}, []
+        )
+    )
+    day_tables = prepare_day_tables(forecast)
+
+    for spot_days in day_tables.values():
+        for group_df in spot_days.values():
+            assert group_df["spot_id"].n_unique() == 1
+            assert group_df["time_friendly"].is_unique().all()
+    assert {label.rsplit(" (", 1)[1] for label in day_tables} == {
+        "Famara)",
+        "La Santa)",
+    }
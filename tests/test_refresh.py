@@ -0,0 +1,67 @@
+import threading
+import time
+
+import polars as pl
+
+from front.one.refresh import ForecastRefresher
+
+
+def test_refresher_keeps_last_good_forecast():
+    frames = [pl.DataFrame({"energy": [1]}), pl.DataFrame(), None]
+    calls = []
+
+    def load_forecast(ahead_seconds=0):
+        calls.append(ahead_seconds)
+        frame = frames[len(calls) - 1]
+        if frame is None:
+            raise RuntimeError("upstream down")
+        return frame
+
+    refresher = ForecastRefresher(load_forecast)
+    assert refresher.get_forecast()["energy"].to_list() == [1]
+
+    assert not refresher.refresh()
+    assert not refresher.refresh()
+    assert refresher.get_forecast()["energy"].to_list() == [1]
+    assert calls == [0, 0, 0]
+
+
+def test_refresher_swaps_in_background():
+    versions = iter(range(1000))
+
+    def load_forecast(ahead_seconds=0):
+        return pl.DataFrame({"version": [next(versions)]})
+
+    refresher = ForecastRefresher(load_forecast, interval_seconds=0.01).start()
+    try:
+        first = refresher.get_forecast()["version"][0]
+        deadline = time.monotonic() + 5
+        while refresher.get_forecast()["version"][0] == first:
+            assert time.monotonic() < deadline
+            time.sleep(0.01)
+    finally:
+        refresher.stop()
+
+
+def test_concurrent_first_renders_load_once():
+    calls = []
+    started = threading.Event()
+
+    def load_forecast(ahead_seconds=0):
+        calls.append(ahead_seconds)
+        started.set()
+        time.sleep(0.2)
+        return pl.DataFrame({"energy": [1]})
+
+    refresher = ForecastRefresher(load_forecast)
+    frames = []
+    first = threading.Thread(target=lambda: frames.append(refresher.get_forecast()))
+    first.start()
+    started.wait(5)
+    second = threading.Thread(target=lambda: frames.append(refresher.get_forecast()))
+    second.start()
+    first.join()
+    second.join()
+
+    assert len(calls) == 1
+    assert [frame["energy"].to_list() for frame in frames] == [[1], [1]]
@@ -0,0 +1,102 @@
+import pytest
+
+from scrapers.retry import (
+    CLOSED,
+    OPEN,
+    CircuitBreaker,
+    CircuitOpenError,
+    ResilientFetcher,
+    RetryPolicy,
+)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def flaky(failures: int):
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        if len(calls) <= failures:
+            raise ConnectionError("upstream down")
+        return {"fcst": {}}
+
+    return fetch
+
+
+def test_retry_backs_off_until_success():
+    delays = []
+    policy = RetryPolicy(max_attempts=3, base_delay=1.0, sleep=delays.append)
+    fetcher = ResilientFetcher("wind", policy=policy)
+
+    assert fetcher.call(flaky(2)) == {"fcst": {}}
+    assert len(delays) == 2
+    assert 0 <= delays[0] <= 1.0 and 0 <= delays[1] <= 2.0
+    assert fetcher.stats() == {
+        "calls": 1,
+        "attempts": 3,
+        "failures": 2,
+        "successes": 1,
+        "short_circuited": 0,
+        "state": CLOSED,
+    }
+
+
+def test_circuit_opens_and_recovers():
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=60, clock=clock)
+    policy = RetryPolicy(max_attempts=2, sleep=lambda delay: None)
+    fetcher = ResilientFetcher("tides", policy=policy, breaker=breaker)
+
+    for _ in range(2):
+        with pytest.raises(ConnectionError):
+            fetcher.call(flaky(10))
+    assert breaker.state == OPEN
+
+    with pytest.raises(CircuitOpenError):
+        fetcher.call(flaky(0))
+    assert fetcher.stats()["short_circuited"] == 1
+
+    clock.now = 61
+    assert fetcher.call(flaky(0)) == {"fcst": {}}
+    assert breaker.state == CLOSED
+
+
+def test_retries_stay_within_the_budget():
+    clock = FakeClock()
+    timeouts = []
+
+    def sleep(delay):
+        clock.now += delay
+
+    def hanging(timeout):
+        # Every attempt runs until its timeout
+        timeouts.append(timeout)
+        clock.now += timeout
+        raise TimeoutError("read timed out")
+
+    policy = RetryPolicy(max_attempts=3, base_delay=1.0, sleep=sleep, clock=clock)
+    fetcher = ResilientFetcher("wind", policy=policy)
+
+    with pytest.raises(TimeoutError):
+        fetcher.call(hanging, budget=25, timeout=20)
+
+    assert timeouts[0] == 20
+    assert len(timeouts) == 2 and timeouts[1] <= 5
+    assert clock.now <= 25
+    assert fetcher.stats()["attempts"] == 2
+
+
+def test_no_attempt_without_budget_left():
+    fetcher = ResilientFetcher("tides", policy=RetryPolicy(sleep=lambda delay: None))
+
+    with pytest.raises(TimeoutError):
+        fetcher.call(flaky(0), budget=0)
+    assert fetcher.stats()["attempts"] == 0
+    assert fetcher.stats()["state"] == CLOSED
@@ -0,0 +1,55 @@
+import itertools
+import random
+
+import polars as pl
+
+from spot_classifier import SPOT_NAMES, classify_spots
+from utils import generate_spot_name, generate_spot_names
+
+DIRECTIONS = ["N", "NNE", "NE", "E", "SE", "S", "SW", "W", "WNW", "NW", "NNW"]
+PREDOMINANT_DIRECTIONS = ["N", "NE", "E", "SE", "S", "SW", "W", "NW"]
+
+
+def build_forecast(rows: list) -> dict:
+    columns = [
+        "wind_direction_predominant",
+        "wind_direction",
+        "wind_speed",
+        "tide_percentage",
+        "wave_period",
+        "energy",
+        "wave_direction",
+        "wave_direction_predominant",
+    ]
+    return {column: [row[i] for row in rows] for i, column in enumerate(columns)}
+
+
+def test_classifier_matches_generate_spot_name():
+    random.seed(0)
+    rows = []
+    for wind_predominant, wind, wave_predominant, wave in itertools.product(
+        PREDOMINANT_DIRECTIONS, DIRECTIONS, PREDOMINANT_DIRECTIONS, DIRECTIONS
+    ):
+        rows.append(
+            (
+                wind_predominant,
+                wind,
+                random.choice([5, 9, 10, 12, 19, 20, 25]),
+                random.choice([0, 20, 50, 60, 80, 81, 100]),
+                random.choice([8, 9, 10, 14]),
+                random.choice([50, 100, 900, 1000, 1001, 1200, 5000, 8000]),
+                wave,
+                wave_predominant,
+            )
+        )
+
+    expected = [generate_spot_name(*row) for row in rows]
+    assert generate_spot_names(build_forecast(rows)) == expected
+    assert set(expected) <= set(SPOT_NAMES)
+
+
+def test_classify_spots_adds_spot_name_column():
+    df = pl.DataFrame(
+        build_forecast([("S", "S", 11, 60, 9, 500, "N", "N")]),
+    )
+    assert classify_spots(df)["spot_name"].to_list() == ["Famara"]
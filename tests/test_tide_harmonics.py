@@ -0,0 +1,63 @@
+from datetime import datetime
+from itertools import pairwise
+
+import numpy as np
+
+from scrapers.tide_harmonics import HarmonicTideModel
+from scrapers.tides import TidesScraperLanzarote
+
+START = datetime(2025, 3, 1).timestamp()
+DAY = 86400
+
+
+def synthetic_model() -> HarmonicTideModel:
+    amplitudes = np.array([0.85, 0.30, 0.18, 0.08, 0.06])
+    phases = np.array([1.0, 2.0, 0.3, 4.0, 5.0])
+    coefficients = np.concatenate(
+        [[1.3], amplitudes * np.cos(phases), amplitudes * np.sin(phases)]
+    )
+    return HarmonicTideModel(coefficients, START)
+
+
+def test_fit_recovers_constituents():
+    truth = synthetic_model()
+    history = truth.extremes(START, START + 30 * DAY, step_seconds=60)
+
+    model = HarmonicTideModel.fit(history)
+
+    end = START + 30 * DAY
+    expected = truth.extremes(end, end + 15 * DAY, step_seconds=60)
+    predicted = model.extremes(end, end + 15 * DAY)
+    assert [tide["tide"] for tide in predicted] == [tide["tide"] for tide in expected]
+    for prediction, tide in zip(predicted, expected):
+        assert abs(prediction["timestamp"] - tide["timestamp"]) < 120
+        assert abs(prediction["height"] - tide["height"]) <= 0.03
+
+    timestamps, heights = model.curve(end, end + DAY, step_seconds=600)
+    assert len(timestamps) == 145
+    np.testing.assert_allclose(heights, truth.heights(timestamps), atol=0.03)
+
+
+def test_future_tides_use_the_fit_when_there_is_history():
+    scraper = TidesScraperLanzarote(session=object())
+    history = synthetic_model().extremes(START, START + 14 * DAY, step_seconds=60)
+    last = history[-1]
+
+    tides = scraper.construct_future_tides(list(history), days_to_extend=5)
+
+    future = tides[len(history) :]
+    assert future[0]["tide"] != last["tide"]
+    assert all(tide["height"] is not None for tide in future)
+    assert all(a["tide"] != b["tide"] for a, b in pairwise(future))
+    assert future[-1]["timestamp"] <= last["timestamp"] + 5 * DAY
+
+
+def test_future_tides_fall_back_to_fixed_interval():
+    scraper = TidesScraperLanzarote(session=object())
+    history = synthetic_model().extremes(START, START + 2 * DAY, step_seconds=60)
+
+    tides = scraper.construct_future_tides(list(history), days_to_extend=1)
+
+    future = tides[len(history) :]
+    assert all(tide["height"] is None for tide in future)
+    assert future[0]["timestamp"] - history[-1]["timestamp"] == 22350
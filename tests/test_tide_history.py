@@ -0,0 +1,78 @@
+import os
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from front.one.tide_history import ingest_tides, last_timestamp, load_tides
+from scrapers.tides import parse_tides
+
+SAMPLE_PAGE = Path(__file__).parent.parent / "samples" / "arrecife_tablademareas.html"
+
+START = datetime(2025, 1, 30, 3, 0)
+
+
+def build_tides(start: datetime, count: int, height=1.0) -> list:
+    tides = []
+    for i in range(count):
+        moment = start + timedelta(hours=6, minutes=12, seconds=30) * i
+        tides.append(
+            {
+                "tide": "pleamar" if i % 2 == 0 else "bajamar",
+                "timestamp": moment.timestamp(),
+                "height": height,
+                "datetime": moment.isoformat(),
+            }
+        )
+    return tides
+
+
+def test_ingest_is_append_only_and_partitioned_by_month(tmp_path):
+    directory = str(tmp_path)
+    tides = build_tides(START, 16)
+
+    assert ingest_tides(tides[:10], directory) == 10
+    assert sorted(os.listdir(tmp_path)) == [
+        "ingest.lock",
+        "tides_2025-01.parquet",
+        "tides_2025-02.parquet",
+    ]
+
+    # Already stored rows are skipped, even with different values
+    rescraped = build_tides(START, 16, height=2.0)
+    extrapolated = {**tides[-1], "timestamp": tides[-1]["timestamp"] + 1}
+    extrapolated["height"] = None
+    assert ingest_tides(rescraped + [extrapolated], directory) == 6
+    assert ingest_tides(rescraped, directory) == 0
+
+    stored = load_tides(directory=directory)
+    assert [tide["timestamp"] for tide in stored] == [
+        tide["timestamp"] for tide in tides
+    ]
+    assert [tide["height"] for tide in stored] == [1.0] * 10 + [2.0] * 6
+    assert last_timestamp(directory) == tides[-1]["timestamp"]
+
+
+def test_load_tides_returns_the_window(tmp_path):
+    directory = str(tmp_path)
+    tides = build_tides(START, 16)
+    ingest_tides(tides, directory)
+
+    window = load_tides(tides[2]["timestamp"], tides[5]["timestamp"], directory)
+
+    assert window == tides[2:6]
+    assert load_tides(start=tides[-1]["timestamp"] + 1, directory=directory) == []
+    assert load_tides(directory=str(tmp_path / "missing")) == []
+
+
+def test_tides_without_height_are_never_stored_as_zero(tmp_path):
+    directory = str(tmp_path)
+    page = SAMPLE_PAGE.read_text(encoding="utf-8").replace(
+        '<span class="tabla_mareas_marea_altura_numero">0,12</span>', "", 1
+    )
+    scraped = parse_tides(page)
+    missing = scraped[1]
+
+    assert ingest_tides(scraped, directory) == len(scraped) - 1
+
+    stored = load_tides(directory=directory)
+    assert missing["timestamp"] not in [tide["timestamp"] for tide in stored]
+    assert all(tide["height"] for tide in stored)
@@ -0,0 +1,101 @@
+from datetime import datetime, timedelta
+
+from tide_index import generate_tide_columns, tide_curve
+
+
+def build_tides(start: datetime, count: int) -> list:
+    tides = []
+    for i in range(count):
+        moment = start + timedelta(hours=6, minutes=12.5) * i
+        tides.append(
+            {
+                "tide": "pleamar" if i % 2 == 0 else "bajamar",
+                "timestamp": moment.timestamp(),
+                "height": 2.5 if i % 2 == 0 else 0.5,
+                "datetime": moment.isoformat(),
+            }
+        )
+    return tides
+
+
+def test_generate_tide_columns():
+    start = datetime(2025, 1, 10, 6, 0)
+    tides = build_tides(start, 4)
+    forecast_datetimes = [
+        start - timedelta(hours=1),
+        start,
+        start + timedelta(hours=1),
+        start + timedelta(hours=4),
+        start + timedelta(hours=3, minutes=6, seconds=15),
+        start + timedelta(days=2),
+    ]
+
+    columns = generate_tide_columns(tides, forecast_datetimes)
+
+    assert columns["tide"] == [
+        "Subiendo hasta las 06:00",
+        "pleamar del todo a las 06:00",
+        "Bajando hasta las 12:12",
+        "Bajando hasta las 12:12",
+        "Bajando hasta las 12:12",
+        "Subiendo hasta las 06:50",
+    ]
+    assert columns["nearest_tide"] == [
+        "Llena",
+        "Llena",
+        "Llena",
+        "Vacía",
+        "Llena",
+        "Vacía",
+    ]
+    assert columns["tide_percentage"] == [0, 100, 94, 28, 50, 0]
+
+
+def test_tide_heights_follow_the_cosine_curve():
+    start = datetime(2025, 1, 10, 6, 0)
+    tides = build_tides(start, 3)
+    tides[-1]["height"] = None
+    forecast_datetimes = [
+        start,
+        start + timedelta(hours=3, minutes=6, seconds=15),
+        start + timedelta(hours=6, minutes=12, seconds=30),
+        start + timedelta(hours=9),
+        start + timedelta(days=1),
+    ]
+
+    columns = generate_tide_columns(tides, forecast_datetimes)
+
+    assert columns["tide_height"] == [2.5, 1.5, 0.5, None, None]
+
+
+def test_tide_curve_has_sub_hourly_resolution():
+    start = datetime(2025, 1, 10, 6, 0)
+    tides = build_tides(start, 3)
+
+    curve = tide_curve(tides, start, start + timedelta(hours=12))
+
+    assert curve.height == 73
+    assert curve["datetime"][1] - curve["datetime"][0] == timedelta(minutes=10)
+    assert curve["tide_height"][0] == 2.5
+    assert curve["tide_height"].min() >= 0.5
+    assert (
+        curve["tide_percentage"].to_list()[:2]
+        == generate_tide_columns(tides, curve["datetime"][:2])["tide_percentage"]
+    )
+
+
+def test_tide_percentage_follows_unequal_ranges():
+    start = datetime(2025, 1, 10, 6, 0)
+    tides = build_tides(start, 4)
+    # A weak second high water
+    tides[2]["height"] = 1.7
+    second_high = start + timedelta(hours=12, minutes=25)
+    forecast_datetimes = [start, second_high]
+
+    columns = generate_tide_columns(tides, forecast_datetimes)
+    assert columns["tide_percentage"] == [100, 60]
+
+    for tide in tides:
+        tide["height"] = None
+    columns = generate_tide_columns(tides, forecast_datetimes)
+    assert columns["tide_percentage"] == [100, 100]
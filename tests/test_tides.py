@@ -0,0 +1,45 @@
+from pathlib import Path
+
+import pytest
+
+from scrapers import tides
+from scrapers.tides import parse_tides, parse_tides_bs4, parse_tides_lxml
+
+SAMPLE_PAGE = Path(__file__).parent.parent / "samples" / "arrecife_tablademareas.html"
+
+
+@pytest.fixture(scope="module")
+def page():
+    return SAMPLE_PAGE.read_text(encoding="utf-8")
+
+
+def test_lxml_parser_matches_bs4(page):
+    pytest.importorskip("lxml")
+    expected = parse_tides_bs4(page)
+
+    assert len(expected) > 100
+    assert expected[0] == {
+        "tide": "pleamar",
+        "timestamp": expected[0]["timestamp"],
+        "height": 2.49,
+        "datetime": "2025-03-01T02:41:00",
+    }
+    assert parse_tides_lxml(page) == expected
+
+
+def test_parse_tides_falls_back_to_bs4(page, monkeypatch):
+    monkeypatch.setattr(tides, "lxml_html", None)
+
+    assert parse_tides(page) == parse_tides_bs4(page)
+
+
+def test_missing_height_is_none_not_zero(page):
+    pytest.importorskip("lxml")
+    page = page.replace(
+        '<span class="tabla_mareas_marea_altura_numero">2,49</span>', "", 1
+    )
+
+    for parse in (parse_tides_bs4, parse_tides_lxml):
+        parsed = parse(page)
+        assert parsed[0]["height"] is None
+        assert parsed[1]["height"] == 0.12
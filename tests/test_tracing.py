@@ -0,0 +1,51 @@
+import json
+
+import polars as pl
+import pytest
+
+from tracing import JsonlExporter, Tracer
+
+
+class FakeClock:
+    def __init__(self, step: float):
+        self.now = 0.0
+        self.step = step
+
+    def __call__(self):
+        self.now += self.step
+        return self.now
+
+
+def test_spans_record_wall_cpu_rows_and_percentiles():
+    tracer = Tracer(window=4, clock=FakeClock(0.01), cpu_clock=FakeClock(0.002))
+
+    for _ in range(6):
+        with tracer.span("forecast.build") as span:
+            span.rows = 1536
+
+    (stats,) = tracer.summary()
+    assert stats["name"] == "forecast.build"
+    assert stats["count"] == 6
+    assert stats["rows"] == 1536
+    assert stats["wall_ms_p50"] == pytest.approx(10.0)
+    assert stats["cpu_ms_p99"] == pytest.approx(2.0)
+    assert len(tracer.samples["forecast.build"]) == 4
+
+
+def test_traced_counts_frame_rows_and_exports_jsonl(tmp_path):
+    filepath = tmp_path / "traces.jsonl"
+    tracer = Tracer(exporter=JsonlExporter(str(filepath)))
+
+    @tracer.traced("forecast.format")
+    def build(rows: int) -> pl.DataFrame:
+        return pl.DataFrame({"energy": range(rows)})
+
+    build(10)
+    with pytest.raises(ValueError), tracer.span("fetch.wind"):
+        raise ValueError("upstream down")
+
+    records = [json.loads(line) for line in filepath.read_text().splitlines()]
+    assert [record["name"] for record in records] == ["forecast.format", "fetch.wind"]
+    assert records[0]["rows"] == 10
+    assert records[1]["error"] == "ValueError"
+    assert records[1]["wall_ms"] >= 0
@@ -0,0 +1,203 @@
+from datetime import datetime, timedelta
+
+import numpy as np
+import polars as pl
+
+# Marea alta y baja hay 6h y 12.5 min
+TIDE_INTERVAL = timedelta(hours=6, minutes=12.5)
+HIGH_TIDE = "pleamar"
+NO_TIDE_DATA = "Sin datos"
+TIDE_CURVE_STEP = timedelta(minutes=10)
+
+
+def to_datetime64(datetimes) -> np.ndarray:
+    if hasattr(datetimes, "to_numpy"):
+        datetimes = datetimes.to_numpy()
+    return np.asarray(datetimes, dtype="datetime64[us]").astype(np.int64)
+
+
+def heights_to_list(heights: np.ndarray) -> list:
+    rounded = np.round(heights, 2).astype(object)
+    rounded[np.isnan(heights)] = None
+    return rounded.tolist()
+
+
+# Tide times are compared as naive datetimes, the same way the forecast
+# datetimes are built from the UTC initstamp in Windguru.build_forecast.
+class TideIndex:
+    def __init__(self, tide_data: list):
+        sorted_tides = sorted(tide_data, key=lambda x: x["timestamp"])
+        self.tides = sorted_tides
+        self.tide_types = np.array(
+            [item["tide"] for item in sorted_tides], dtype=object
+        )
+        self.is_high = self.tide_types == HIGH_TIDE
+        # Extrapolated tides have no height
+        self.heights = np.array(
+            [
+                np.nan if item.get("height") is None else item["height"]
+                for item in sorted_tides
+            ],
+            dtype=float,
+        )
+        tide_datetimes = [
+            datetime.fromtimestamp(item["timestamp"]) for item in sorted_tides
+        ]
+        self.datetimes = to_datetime64(tide_datetimes)
+
+        next_datetimes = tide_datetimes[1:] + [
+            tide_datetime + TIDE_INTERVAL for tide_datetime in tide_datetimes[-1:]
+        ]
+        tide_hours = [
+            tide_datetime.strftime("%H:%M") for tide_datetime in tide_datetimes
+        ]
+        next_tide_hours = [
+            tide_datetime.strftime("%H:%M") for tide_datetime in next_datetimes
+        ]
+        # Every possible status text is built once per tide, not once per hour
+        self.status_after = np.array(
+            [
+                f"{'Bajando' if is_high else 'Subiendo'} hasta las {hour}"
+                for is_high, hour in zip(self.is_high, next_tide_hours)
+            ],
+            dtype=object,
+        )
+        self.status_before = np.array(
+            [
+                f"{'Subiendo' if is_high else 'Bajando'} hasta las {hour}"
+                for is_high, hour in zip(self.is_high, tide_hours)
+            ],
+            dtype=object,
+        )
+        self.status_at = np.array(
+            [
+                f"{tide_type} del todo a las {hour}"
+                for tide_type, hour in zip(self.tide_types, tide_hours)
+            ],
+            dtype=object,
+        )
+
+    def __len__(self):
+        return len(self.datetimes)
+
+    def nearest(self, forecast: np.ndarray) -> np.ndarray:
+        last = len(self) - 1
+        right = np.searchsorted(self.datetimes, forecast, side="left")
+        before = np.clip(right - 1, 0, last)
+        after = np.clip(right, 0, last)
+        # Ties go to the earlier tide, like min() over the sorted list
+        return np.where(
+            self.datetimes[after] - forecast < forecast - self.datetimes[before],
+            after,
+            before,
+        )
+
+    def bracketing(self, forecast: np.ndarray):
+        right = np.searchsorted(self.datetimes, forecast, side="left")
+        before = right - 1
+        # A forecast exactly on the first tide is still inside the first pair
+        before = np.where((right == 0) & (forecast == self.datetimes[0]), 0, before)
+        valid = (before >= 0) & (before + 1 < len(self))
+        before = np.clip(before, 0, max(len(self) - 2, 0))
+        return before, valid
+
+    def curve_factors(self, forecast: np.ndarray):
+        # 0 at the earlier tide of the bracketing pair, 1 at the later one
+        before, valid = self.bracketing(forecast)
+        start = self.datetimes[before]
+        end = self.datetimes[before + 1]
+        progress = np.clip((forecast - start) / (end - start), 0, 1)
+        return before, valid, (1 - np.cos(progress * np.pi)) / 2
+
+    def percentages(self, forecast: np.ndarray) -> np.ndarray:
+        if len(self) < 2:
+            return np.zeros(len(forecast), dtype=np.int64)
+        before, valid, curve_factor = self.curve_factors(forecast)
+        percentage = np.where(
+            self.is_high[before], (1 - curve_factor) * 100, curve_factor * 100
+        )
+        # With heights, the water level is placed in the range of the tides
+        # around it, so a weak high does not read as a full tide
+        heights = self.interpolate_heights(before, valid, curve_factor)
+        low, high = self.local_range(before)
+        from_heights = np.isfinite(heights) & (high > low)
+        level = (heights - low) / np.where(from_heights, high - low, 1)
+        percentage = np.where(from_heights, np.clip(level, 0, 1) * 100, percentage)
+        return np.where(valid, np.rint(percentage), 0).astype(np.int64)
+
+    def local_range(self, before: np.ndarray):
+        # Lowest and highest known height from the tide before the bracketing
+        # pair to the one after it
+        window = np.clip(before[:, None] + np.arange(-1, 3), 0, len(self) - 1)
+        heights = self.heights[window]
+        missing = np.isnan(heights)
+        low = np.where(missing, np.inf, heights).min(axis=1)
+        high = np.where(missing, -np.inf, heights).max(axis=1)
+        return low, high
+
+    def interpolate_heights(
+        self, before: np.ndarray, valid: np.ndarray, curve_factor: np.ndarray
+    ) -> np.ndarray:
+        start = self.heights[before]
+        end = self.heights[before + 1]
+        return np.where(valid, start + (end - start) * curve_factor, np.nan)
+
+    def water_heights(self, forecast: np.ndarray) -> np.ndarray:
+        # Metres, NaN outside the table or next to a tide without height
+        if len(self) < 2:
+            return np.full(len(forecast), np.nan)
+        return self.interpolate_heights(*self.curve_factors(forecast))
+
+    def align(self, forecast_datetimes) -> dict:
+        forecast = to_datetime64(forecast_datetimes)
+        if not len(self):
+            return {
+                "tide": [NO_TIDE_DATA] * len(forecast),
+                "nearest_tide": [NO_TIDE_DATA] * len(forecast),
+                "tide_percentage": [0] * len(forecast),
+                "tide_height": [None] * len(forecast),
+            }
+        nearest = self.nearest(forecast)
+        nearest_datetimes = self.datetimes[nearest]
+        tide = np.where(
+            forecast > nearest_datetimes,
+            self.status_after[nearest],
+            np.where(
+                forecast < nearest_datetimes,
+                self.status_before[nearest],
+                self.status_at[nearest],
+            ),
+        )
+        nearest_tide = np.where(self.is_high[nearest], "Llena", "Vacía")
+        return {
+            "tide": tide.tolist(),
+            "nearest_tide": nearest_tide.tolist(),
+            "tide_percentage": self.percentages(forecast).tolist(),
+            "tide_height": heights_to_list(self.water_heights(forecast)),
+        }
+
+
+def generate_tide_columns(tide_data: list, forecast_datetimes) -> dict:
+    return TideIndex(tide_data).align(forecast_datetimes)
+
+
+def tide_curve(
+    tide_data: list,
+    start: datetime,
+    end: datetime,
+    step: timedelta = TIDE_CURVE_STEP,
+) -> pl.DataFrame:
+    datetimes = np.arange(
+        np.datetime64(start, "us"),
+        np.datetime64(end, "us") + 1,
+        np.timedelta64(step),
+    )
+    index = TideIndex(tide_data)
+    forecast = datetimes.astype(np.int64)
+    return pl.DataFrame(
+        {
+            "datetime": datetimes,
+            "tide_height": index.water_heights(forecast),
+            "tide_percentage": index.percentages(forecast),
+        }
+    ).with_columns(pl.col("tide_height").fill_nan(None).round(2))
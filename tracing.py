@@ -0,0 +1,158 @@
+import json
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from functools import wraps
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+
+TRACE_EXPORT_PATH = "data/traces.jsonl"
+# Samples kept per span for the rolling percentiles
+TRACE_WINDOW = 256
+TRACE_PERCENTILES = (50, 90, 99)
+
+
+def count_rows(result) -> Optional[int]:
+    if hasattr(result, "height"):
+        return result.height
+    if isinstance(result, (list, tuple, dict)):
+        return len(result)
+    return None
+
+
+class Span:
+    def __init__(self, name: str, rows: Optional[int] = None):
+        self.name = name
+        self.rows = rows
+        self.started_at = time.time()
+        self.wall_ms: Optional[float] = None
+        self.cpu_ms: Optional[float] = None
+        self.error: Optional[str] = None
+
+    def to_dict(self) -> Dict:
+        return {
+            "name": self.name,
+            "started_at": self.started_at,
+            "wall_ms": self.wall_ms,
+            "cpu_ms": self.cpu_ms,
+            "rows": self.rows,
+            "error": self.error,
+        }
+
+
+class JsonlExporter:
+    def __init__(self, filepath: str = TRACE_EXPORT_PATH):
+        self.filepath = filepath
+        self._lock = threading.Lock()
+
+    def export(self, record: Dict):
+        line = json.dumps(record, ensure_ascii=False)
+        with self._lock:
+            os.makedirs(os.path.dirname(self.filepath) or ".", exist_ok=True)
+            with open(self.filepath, "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+
+
+class Tracer:
+    # Wall time from perf_counter and CPU time of the running thread, so spans
+    # inside the fetch workers only count their own work
+    def __init__(
+        self,
+        window: int = TRACE_WINDOW,
+        exporter: Optional[JsonlExporter] = None,
+        clock: Callable[[], float] = time.perf_counter,
+        cpu_clock: Callable[[], float] = time.thread_time,
+    ):
+        self.window = window
+        self.exporter = exporter
+        self.clock = clock
+        self.cpu_clock = cpu_clock
+        self.samples = {}
+        self.counts = {}
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def span(self, name: str, rows: Optional[int] = None):
+        span = Span(name, rows)
+        wall_start = self.clock()
+        cpu_start = self.cpu_clock()
+        try:
+            yield span
+        except BaseException as error:
+            span.error = type(error).__name__
+            raise
+        finally:
+            span.wall_ms = (self.clock() - wall_start) * 1000
+            span.cpu_ms = (self.cpu_clock() - cpu_start) * 1000
+            self.record(span)
+
+    def traced(self, name: Optional[str] = None):
+        def decorator(func):
+            span_name = name or func.__qualname__
+
+            @wraps(func)
+            def wrapper(*args, **kwargs):
+                with self.span(span_name) as span:
+                    result = func(*args, **kwargs)
+                    span.rows = count_rows(result)
+                    return result
+
+            return wrapper
+
+        return decorator
+
+    def record(self, span: Span):
+        with self._lock:
+            samples = self.samples.setdefault(span.name, deque(maxlen=self.window))
+            samples.append((span.wall_ms, span.cpu_ms, span.rows))
+            self.counts[span.name] = self.counts.get(span.name, 0) + 1
+            exporter = self.exporter
+        if exporter is not None:
+            exporter.export(span.to_dict())
+
+    def summary(self) -> List[Dict]:
+        with self._lock:
+            samples = {name: list(values) for name, values in self.samples.items()}
+            counts = dict(self.counts)
+
+        summary = []
+        for name, values in sorted(samples.items()):
+            wall = np.array([value[0] for value in values])
+            cpu = np.array([value[1] for value in values])
+            rows = [value[2] for value in values if value[2] is not None]
+            stats = {"name": name, "count": counts[name]}
+            for label, data in (("wall_ms", wall), ("cpu_ms", cpu)):
+                for percentile, value in zip(
+                    TRACE_PERCENTILES, np.percentile(data, TRACE_PERCENTILES)
+                ):
+                    stats[f"{label}_p{percentile}"] = round(float(value), 3)
+            stats["rows"] = rows[-1] if rows else None
+            summary.append(stats)
+        return summary
+
+    def set_exporter(self, exporter: Optional[JsonlExporter]):
+        with self._lock:
+            self.exporter = exporter
+
+    def reset(self):
+        with self._lock:
+            self.samples.clear()
+            self.counts.clear()
+
+
+_tracer = Tracer()
+
+
+def get_tracer() -> Tracer:
+    return _tracer
+
+
+def span(name: str, rows: Optional[int] = None):
+    return _tracer.span(name, rows)
+
+
+def traced(name: Optional[str] = None):
+    return _tracer.traced(name)
@@ -9,3 +9,20 @@ WINDGURU_URLS = [
     # "https://www.windguru.cz/501281",  # la santa
     # "https://www.windguru.cz/830259",  # arrecife
 ]
+
+# Forecast points, shown next to the spot name when several are enabled
+SPOT_LOCATIONS = {
+    "49323": "Las Cucharas",
+    "207014": "La Garita",
+    "49328": "Famara",
+    "49319": "Playa Dorada",
+    "49320": "Los Pocillos",
+    "49321": "Matagorda",
+    "49322": "Playa Honda",
+    "501281": "La Santa",
+    "830259": "Arrecife",
+}
+
+
+def get_spot_ids(urls: list = WINDGURU_URLS) -> list:
+    return [url.rstrip("/").rsplit("/", 1)[-1] for url in urls]
@@ -2,9 +2,22 @@ import math
 from datetime import date, datetime, time, timedelta, timezone
 from typing import Dict
 
+import numpy as np
 import polars as pl
 import streamlit as st
 
+from forecast_schema import (
+    COMPASS,
+    COMPASS_DIRECTIONS,
+    DATE_NAME,
+    PREDOMINANT,
+    compact_forecast,
+)
+from spot_classifier import classify_spots
+from tide_index import generate_tide_columns
+from tracing import traced
+from urls.windguru import SPOT_LOCATIONS
+
 MONTH_MAPPING = {
     "Ene": "01",
     "Feb": "02",
@@ -24,6 +37,10 @@ INTERNAL_TIME_STR_FORMAT = "%H:%M:%S"
 FRONT_END_DATE_FORMAT = "%A, %d de %B de %Y"
 
 CONTRARIES = {"N": "S", "S": "N", "E": "W", "W": "E"}
+WAVELENGTH_ITERATIONS = 8
+# Forecast hours outside this window are never shown
+DISPLAY_START_TIME = time(hour=6)
+DISPLAY_END_TIME = time(hour=19)
 
 
 def calculate_energy(wave_height, wave_period, width=1.0, water_density=1025):
@@ -36,11 +53,49 @@ def calculate_energy(wave_height, wave_period, width=1.0, water_density=1025):
     return math.ceil(energy_kj)
 
 
+def wavelengths(wave_periods, pi: float = 3.14159, depth=None) -> np.ndarray:
+    g = 9.81
+    deep_water = (g * wave_periods**2) / (2 * pi)
+    if depth is None:
+        return deep_water
+    # Finite depth: solve the dispersion relation w^2 = g k tanh(k d) for k with
+    # Newton steps, starting from the deep water wavenumber
+    with np.errstate(divide="ignore", invalid="ignore"):
+        omega = 2 * pi / wave_periods
+        k = 2 * pi / deep_water
+        for _ in range(WAVELENGTH_ITERATIONS):
+            tanh_kd = np.tanh(k * depth)
+            f = g * k * tanh_kd - omega**2
+            df = g * tanh_kd + g * k * depth * (1 - tanh_kd**2)
+            k = k - f / df
+        # A zero period (filled gaps) has no wave, as in deep water
+        return np.where(wave_periods > 0, 2 * pi / k, 0.0)
+
+
+def wave_energy(
+    wave_heights,
+    wave_periods,
+    width=1.0,
+    water_density=1025,
+    exact_pi: bool = False,
+    depth=None,
+) -> np.ndarray:
+    # Same operations in the same order as calculate_energy, so the default
+    # mode matches it bit for bit
+    g = 9.81
+    wave_heights = np.asarray(wave_heights, dtype=float)
+    wave_periods = np.asarray(wave_periods, dtype=float)
+    wavelength = wavelengths(
+        wave_periods, pi=math.pi if exact_pi else 3.14159, depth=depth
+    )
+    energy_density = (1 / 8) * water_density * g * wave_heights**2
+    energy_joules = energy_density * wavelength * width
+    energy_kj = energy_joules / 1000
+    return np.ceil(energy_kj).astype(np.int64)
+
+
 def generate_energy(wave_heights: list, wave_periods: list):
-    return [
-        calculate_energy(wave_height=wave_height, wave_period=wave_period)
-        for wave_height, wave_period in zip(wave_heights, wave_periods)
-    ]
+    return wave_energy(wave_heights, wave_periods).tolist()
 
 
 def el_espino_conditions(
@@ -809,31 +864,22 @@ def generate_spot_name(
 
 
 def generate_spot_names(forecast: Dict[str, list]) -> list:
-    spot_names = []
-    wind_direction_predominant = forecast["wind_direction_predominant"]
-    wave_direction_predominant = forecast["wave_direction_predominant"]
-    wind_direction = forecast["wind_direction"]
-    wave_direction = forecast["wave_direction"]
-    wind_speed = forecast["wind_speed"]
-    wave_period = forecast["wave_period"]
-    tide_percentage = forecast["tide_percentage"]
-    energy = forecast["energy"]
-
-    for wid_predominant, wad_predominant, wid, wad, ws, tp, wp, e in zip(
-        wind_direction_predominant,
-        wave_direction_predominant,
-        wind_direction,
-        wave_direction,
-        wind_speed,
-        tide_percentage,
-        wave_period,
-        energy,
-    ):
-        spot_name = generate_spot_name(
-            wid_predominant, wid, ws, tp, wp, e, wad, wad_predominant
-        )
-        spot_names.append(spot_name)
-    return spot_names
+    columns = [
+        "wind_direction_predominant",
+        "wave_direction_predominant",
+        "wind_direction",
+        "wave_direction",
+        "wind_speed",
+        "wave_period",
+        "tide_percentage",
+        "energy",
+    ]
+    min_len = min(len(forecast[column]) for column in columns)
+    df = pl.DataFrame(
+        {column: forecast[column][:min_len] for column in columns},
+        strict=False,
+    )
+    return classify_spots(df)["spot_name"].to_list()
 
 
 def combine_df(df1, df2):
@@ -881,20 +927,20 @@ def get_day_name(days_to_add: float) -> str:
 
 
 def create_direction_predominant_column(directions: list) -> list:
-    return [get_predominant_direction(int(dir)) for dir in directions]
+    return predominant_from_degrees(directions).tolist()
 
 
+@traced("forecast.format")
 def final_forecast_format(df: pl.DataFrame):
     if not df.is_empty():
-        df.sort(by=["date", "time", "spot_name"], descending=[True, True, True])
-        times = df["time"]
-        df = df.with_columns(pl.col("datetime").dt.convert_time_zone("UTC"))
-        datetimes = df["datetime"]
-        _6_AM = time(hour=6, minute=0, second=0, microsecond=0)
-        _19_PM = time(hour=19, minute=0, second=0, microsecond=0)
-        now = datetime.now(timezone.utc)
-        mask = (times >= _6_AM) & (times <= _19_PM) & (datetimes >= now)
-        df = df.filter(mask)
+        now = datetime.now(timezone.utc).replace(tzinfo=None)
+        forecast = (
+            df.lazy()
+            .filter(display_hours_expr(pl.col("datetime")))
+            .filter(pl.col("datetime") >= now)
+            .with_columns(display_columns())
+            .with_columns(pl.col("datetime").dt.convert_time_zone("UTC"))
+        )
         common_columns = [
             "spot_name",
             "date_name",
@@ -907,6 +953,7 @@ def final_forecast_format(df: pl.DataFrame):
             "wave_direction",
             "wind_speed",
             "tide_percentage",
+            "tide_height",
             "nearest_tide",
             "tide",
             "datetime",
@@ -918,10 +965,25 @@ def final_forecast_format(df: pl.DataFrame):
             "wind_direction_degrees",
             "wave_direction_degrees",
         ]
-        df = df[common_columns]
+        if "spot_id" in df.columns:
+            common_columns.append("spot_id")
+        df = compact_forecast(forecast.select(common_columns).collect())
+        df = df.with_columns(spot_label_expr(df).alias("spot_label"))
     return df
 
 
+def spot_label_expr(df: pl.DataFrame) -> pl.Expr:
+    # The classifier names spots by conditions only, so with several forecast
+    # points the same spot_name shows up once per point
+    spot_name = pl.col("spot_name").cast(pl.Utf8)
+    if "spot_id" not in df.columns or df["spot_id"].n_unique() < 2:
+        return spot_name
+    location = pl.col("spot_id").replace_strict(
+        SPOT_LOCATIONS, default=pl.col("spot_id"), return_dtype=pl.Utf8
+    )
+    return pl.concat_str([spot_name, pl.lit(" ("), location, pl.lit(")")])
+
+
 def datetime_to_frontend_str(dt: datetime) -> str:
     return dt.strftime(FRONT_END_DATE_FORMAT).capitalize()
 
@@ -941,96 +1003,15 @@ def datestr_to_datetime(dtstr, format) -> datetime:
 
 
 def generate_tides(tide_data: list, forecast_datetimes: list) -> list:
-    tide_status_list = []
-    tides_datetimes_list = [
-        datetime.fromtimestamp(item["timestamp"]) for item in tide_data
-    ]
-    tides_tide_list = [item["tide"] for item in tide_data]
-
-    for forecast_datetime in forecast_datetimes:
-        closest_datetime = min(
-            tides_datetimes_list, key=lambda dt: abs(dt - forecast_datetime)
-        )
-        closest_datetime_index = tides_datetimes_list.index(closest_datetime)
-        tide_status = tides_tide_list[closest_datetime_index]
-
-        try:
-            next_tide_datetime = tides_datetimes_list[closest_datetime_index + 1]
-        except IndexError:
-            # Marea alta y baja hay 6h y 12.5 min
-            next_tide_datetime = closest_datetime + timedelta(hours=6, minutes=12.5)
-
-        tide_hour = closest_datetime.time()
-        next_tide_hour = next_tide_datetime.time()
-
-        if forecast_datetime > closest_datetime:
-            status = "Bajando" if tide_status == "pleamar" else "Subiendo"
-            s = f"{status} hasta las {next_tide_hour.strftime('%H:%M')}"
-        elif forecast_datetime < closest_datetime:
-            status = "Subiendo" if tide_status == "pleamar" else "Bajando"
-            s = f"{status} hasta las {tide_hour.strftime('%H:%M')}"
-        else:
-            s = f"{tide_status} del todo a las {tide_hour.strftime('%H:%M')}"
-
-        tide_status_list.append(s)
-
-    return tide_status_list
+    return generate_tide_columns(tide_data, forecast_datetimes)["tide"]
 
 
 def generate_nearest_tides(tide_data: dict, forecast_datetimes: dict) -> list:
-    nearest_tides = []
-    tides_datetimes_list = [
-        datetime.fromtimestamp(item["timestamp"]) for item in tide_data
-    ]
-    tides_tide_list = [item["tide"] for item in tide_data]
-
-    for forecast_datetime in forecast_datetimes:
-        closest_datetime = min(
-            tides_datetimes_list, key=lambda dt: abs(dt - forecast_datetime)
-        )
-        closest_datetime_index = tides_datetimes_list.index(closest_datetime)
-        tide_status = tides_tide_list[closest_datetime_index]
-        tide_status = "Llena" if tide_status == "pleamar" else "Vacía"
-        nearest_tides.append(tide_status)
-    return nearest_tides
+    return generate_tide_columns(tide_data, forecast_datetimes)["nearest_tide"]
 
 
 def generate_tide_percentages(tide_data: list, forecast_datetimes: list) -> list:
-    tide_percentages = []
-    sorted_tides = sorted(tide_data, key=lambda x: x["timestamp"])
-
-    for forecast_datetime in forecast_datetimes:
-        forecast_ts = forecast_datetime.timestamp()
-        before = None
-        after = None
-
-        for i in range(len(sorted_tides) - 1):
-            if (
-                sorted_tides[i]["timestamp"]
-                <= forecast_ts
-                <= sorted_tides[i + 1]["timestamp"]
-            ):
-                before = sorted_tides[i]
-                after = sorted_tides[i + 1]
-                break
-
-        if not before or not after:
-            tide_percentages.append(0)
-            continue
-
-        if before["tide"] == "pleamar":
-            high_tide_dt = datetime.fromtimestamp(before["timestamp"])
-            low_tide_dt = datetime.fromtimestamp(after["timestamp"])
-        else:
-            low_tide_dt = datetime.fromtimestamp(before["timestamp"])
-            high_tide_dt = datetime.fromtimestamp(after["timestamp"])
-
-        tide_percentage = calculate_tide_percentage(
-            high_tide_dt, low_tide_dt, forecast_datetime
-        )
-        tide_percentages.append(tide_percentage)
-
-    return tide_percentages
+    return generate_tide_columns(tide_data, forecast_datetimes)["tide_percentage"]
 
 
 def find_next_tide(tides_datetimes_list, tides_tide_list, start_index, tide_type):
@@ -1078,38 +1059,117 @@ def get_predominant_direction(direction: float) -> str:
 
 
 def degrees_to_direction(degrees: int) -> str:
-    compass_directions = [
-        "N",
-        "NNE",
-        "NE",
-        "ENE",
-        "E",
-        "ESE",
-        "SE",
-        "SSE",
-        "S",
-        "SSW",
-        "SW",
-        "WSW",
-        "W",
-        "WNW",
-        "NW",
-        "NNW",
-    ]
-
+    compass_directions = COMPASS_DIRECTIONS
     sector_size = 360 / len(compass_directions)
     degrees = degrees % 360
     index = int((degrees + sector_size / 2) // sector_size) % len(compass_directions)
     return compass_directions[index]
 
 
-def generate_forecast_moments(initstamp, hours):
-    init_datetime = datetime.fromtimestamp(initstamp, tz=timezone.utc).replace(
-        tzinfo=None
+# Built from the scalar functions above, so the vectorized conversion below
+# gives exactly the same labels, including the exact 0/90/180/270 cases
+COMPASS_LUT = np.array([degrees_to_direction(degree) for degree in range(360)])
+PREDOMINANT_LUT = np.array(
+    [get_predominant_direction(degree) for degree in range(361)], dtype=object
+)
+
+
+def directions_from_degrees(degrees) -> np.ndarray:
+    degrees = np.asarray(degrees)
+    if np.issubdtype(degrees.dtype, np.integer):
+        return COMPASS_LUT[np.mod(degrees, 360)]
+    # Fractional degrees can't index the table, same formula as the scalar one
+    sector_size = 360 / len(COMPASS_DIRECTIONS)
+    index = ((np.mod(degrees, 360) + sector_size / 2) // sector_size).astype(int)
+    return np.array(COMPASS_DIRECTIONS)[index % len(COMPASS_DIRECTIONS)]
+
+
+def predominant_from_degrees(degrees) -> np.ndarray:
+    degrees = np.trunc(np.asarray(degrees, dtype=float)).astype(np.int64)
+    in_range = (degrees >= 0) & (degrees <= 360)
+    return np.where(in_range, PREDOMINANT_LUT[np.clip(degrees, 0, 360)], None)
+
+
+def wave_directions_from_degrees(degrees) -> np.ndarray:
+    degrees = np.asarray(degrees)
+    # Same WNW override as ammend_wave_directions
+    return np.where(
+        (degrees >= 300) & (degrees <= 315), "WNW", directions_from_degrees(degrees)
     )
-    moments = [init_datetime + timedelta(hours=hour) for hour in hours]
 
-    return moments
+
+def compass_expr(degrees: pl.Expr) -> pl.Expr:
+    return (degrees % 360).replace_strict(
+        list(range(360)), COMPASS_LUT.tolist(), return_dtype=COMPASS
+    )
+
+
+def predominant_expr(degrees: pl.Expr) -> pl.Expr:
+    return degrees.replace_strict(
+        list(range(361)),
+        PREDOMINANT_LUT.tolist(),
+        default=None,
+        return_dtype=PREDOMINANT,
+    )
+
+
+def wave_compass_expr(degrees: pl.Expr) -> pl.Expr:
+    return (
+        pl.when(degrees.is_between(300, 315))
+        .then(pl.lit("WNW", dtype=COMPASS))
+        .otherwise(compass_expr(degrees))
+    )
+
+
+def wave_energy_expr(heights: pl.Expr, periods: pl.Expr) -> pl.Expr:
+    return pl.map_batches(
+        [heights, periods],
+        lambda columns: pl.Series(
+            wave_energy(columns[0].to_numpy(), columns[1].to_numpy())
+        ),
+        return_dtype=pl.Int64,
+        is_elementwise=True,
+    )
+
+
+def display_hours_expr(datetimes: pl.Expr) -> pl.Expr:
+    return datetimes.dt.time().is_between(DISPLAY_START_TIME, DISPLAY_END_TIME)
+
+
+def friendly_date_labels(dates: pl.Series) -> pl.Series:
+    # Locale names only depend on the day, so they are built once per date
+    unique_dates = dates.unique().drop_nulls()
+    midnights = [datetime.combine(day, time()) for day in unique_dates]
+    return dates.replace_strict(
+        unique_dates,
+        [datetime_to_frontend_str(midnight) for midnight in midnights],
+        return_dtype=pl.Utf8,
+    )
+
+
+def date_name_labels(dates: pl.Series) -> pl.Series:
+    unique_dates = dates.unique().drop_nulls()
+    midnights = [datetime.combine(day, time()) for day in unique_dates]
+    return dates.replace_strict(
+        unique_dates, create_date_name_column(midnights), return_dtype=DATE_NAME
+    )
+
+
+def display_columns() -> list:
+    # Presentation columns, only computed for the rows that survive the
+    # display window. date_name is relative to today, so it is never cached.
+    dates = pl.col("datetime").dt.date()
+    time_friendly = pl.col("datetime").dt.strftime("%H:%M")
+    return [
+        dates.alias("date"),
+        dates.map_batches(friendly_date_labels, return_dtype=pl.Utf8).alias(
+            "date_friendly"
+        ),
+        pl.col("datetime").dt.time().alias("time"),
+        time_friendly.alias("time_friendly"),
+        time_friendly.str.replace_all(":", r"\:", literal=True).alias("time_graph"),
+        dates.map_batches(date_name_labels, return_dtype=DATE_NAME).alias("date_name"),
+    ]
 
 
 def ammend_wave_directions(wave_directions, wave_direction_degrees):
@@ -1120,27 +1180,6 @@ def ammend_wave_directions(wave_directions, wave_direction_degrees):
     return wave_directions
 
 
-def clean_list(my_list):
-    cleaned = []
-    for i, element in enumerate(my_list):
-        if element is None:
-            if i == 0:
-                cleaned.append(0)
-            else:
-                cleaned.append(cleaned[-1])
-        else:
-            cleaned.append(math.ceil(element))
-    return cleaned
-
-
-def align_dict_columns(data: dict) -> dict:
-    min_len = min(len(v) for v in data.values() if isinstance(v, (list, tuple)))
-    aligned = {
-        k: (v[:min_len] if isinstance(v, (list, tuple)) else v) for k, v in data.items()
-    }
-    return aligned
-
-
 def is_mobile():
     headers = st.context.headers
     if headers: